@@ -0,0 +1,4 @@
+"""
+Benchmarks y pruebas de carga.
+Se ejecutan desde src/, por ejemplo: python -m benchmarks.ingest_stress
+"""
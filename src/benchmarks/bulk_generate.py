@@ -0,0 +1,40 @@
+"""
+Mide la generación por columnas de ventas sintéticas y su carga en el almacén.
+
+Uso: python -m benchmarks.bulk_generate [ventas] [repeticiones]
+"""
+
+import os
+import sys
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+os.environ.setdefault("EXPENDIO_LOG_TO_FILE", "false")
+os.environ.setdefault("EXPENDIO_LOG_LEVEL", "WARNING")
+
+import time
+
+from core import data_store, updater
+
+
+def main():
+    backend = "numpy" if updater.np is not None else "python"
+    print(f"{COUNT:,} ventas por ronda (generador {backend}, historial {data_store.sales_history.capacity})")
+    for round_number in range(1, ROUNDS + 1):
+        started = time.perf_counter()
+        columns = updater.generate_sales_columns(COUNT, seed=round_number)
+        generated = time.perf_counter()
+        data_store.add_sales_columns(*columns, presorted=True)
+        stored = time.perf_counter()
+        print(
+            f"  ronda {round_number}: generar {generated - started:.3f}s | "
+            f"almacenar {stored - generated:.3f}s | "
+            f"{COUNT / (stored - started):,.0f} ventas/s"
+        )
+    assert data_store.get_version() == COUNT * ROUNDS
+    print(f"Estadísticas finales: {data_store.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark del camino caliente de events.dispatcher.dispatch.
+
+Mide el coste por dispatch y por suscriptor con callbacks vacíos, para
+suscripciones normales y débiles, y lo compara con la implementación
+anterior (listas mutables + f-string de debug en cada llamada).
+
+Uso: python -m benchmarks.dispatch_bench
+"""
+
+import os
+
+os.environ.setdefault("EXPENDIO_LOG_TO_FILE", "false")
+os.environ.setdefault("EXPENDIO_LOG_LEVEL", "INFO")
+
+import timeit
+
+from events import dispatcher
+from infrastructure.logger import logger
+
+SUBSCRIBER_COUNTS = (0, 1, 4, 16, 64)
+LEGACY_SUBSCRIBERS = {}
+
+
+def legacy_dispatch(event, data=None):
+    """Dispatch previo: dos búsquedas y el mensaje de debug siempre formateado."""
+    callback_count = len(LEGACY_SUBSCRIBERS.get(event, []))
+    logger.debug(f"📢 Despachando evento '{event}' a {callback_count} suscriptores")
+    for callback in LEGACY_SUBSCRIBERS.get(event, []):
+        try:
+            callback(data)
+        except Exception as e:
+            logger.error(f"💥 Error en callback del evento {event}: {e}")
+
+
+def noop(data):
+    pass
+
+
+class Listener:
+    def on_event(self, data):
+        pass
+
+
+def measure(function, event, repeat=5, number=20000):
+    """Mejor tiempo por llamada en nanosegundos."""
+    timer = timeit.Timer(lambda: function(event, 1))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run():
+    print(f"{'suscriptores':>12} | {'anterior':>10} | {'actual':>10} | {'débil':>10} | {'ns/susc. actual':>15} | {'ns/susc. débil':>14}")
+    listeners = []
+    base = None
+    for count in SUBSCRIBER_COUNTS:
+        strong_event = f"BENCH_STRONG_{count}"
+        weak_event = f"BENCH_WEAK_{count}"
+        LEGACY_SUBSCRIBERS[strong_event] = [noop] * count
+        for _ in range(count):
+            dispatcher.subscribe(strong_event, noop)
+            listener = Listener()
+            listeners.append(listener)
+            dispatcher.subscribe(weak_event, listener.on_event, weak=True)
+
+        legacy = measure(legacy_dispatch, strong_event)
+        current = measure(dispatcher.dispatch, strong_event)
+        weak = measure(dispatcher.dispatch, weak_event)
+        if base is None:
+            base = current
+        per_subscriber = (current - base) / count if count else 0.0
+        per_weak = (weak - base) / count if count else 0.0
+        print(
+            f"{count:>12} | {legacy:>8.0f}ns | {current:>8.0f}ns | {weak:>8.0f}ns"
+            f" | {per_subscriber:>13.1f}ns | {per_weak:>12.1f}ns"
+        )
+
+
+if __name__ == "__main__":
+    run()
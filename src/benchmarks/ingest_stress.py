@@ -0,0 +1,90 @@
+"""
+Prueba de estrés de la ingesta multi-productor (core.ingest).
+
+Lanza muchos hilos productores que envían ventas a la vez mientras otros
+hilos suscriben y desuscriben callbacks del dispatcher, y verifica que
+ninguna venta se pierda ni se duplique y que los agregados cuadren.
+
+Uso: python -m benchmarks.ingest_stress [productores] [ventas_por_productor]
+"""
+
+import os
+import sys
+
+PRODUCERS = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+SALES_PER_PRODUCER = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+TOTAL = PRODUCERS * SALES_PER_PRODUCER
+
+# El historial debe retener todas las ventas para poder verificarlas
+os.environ["EXPENDIO_MAX_HISTORY"] = str(TOTAL)
+os.environ.setdefault("EXPENDIO_LOG_TO_FILE", "false")
+os.environ.setdefault("EXPENDIO_LOG_LEVEL", "WARNING")
+
+import asyncio
+import threading
+import time
+
+from core import data_store, ingest
+from core.sale import Sale, product_id
+from events import dispatcher
+
+
+async def run():
+    ingest.start()
+    loop = asyncio.get_running_loop()
+    done = asyncio.Event()
+    batches = []
+
+    def on_batch(sales):
+        batches.append(len(sales))
+        if data_store.get_version() >= TOTAL:
+            done.set()
+
+    dispatcher.subscribe("SALES_ADDED_BATCH", on_batch)
+
+    pid = product_id("stress")
+    start_barrier = threading.Barrier(PRODUCERS + 1)
+    stop_churn = threading.Event()
+
+    def producer(worker):
+        start_barrier.wait()
+        for n in range(SALES_PER_PRODUCER):
+            # El precio codifica productor y número para detectar pérdidas o duplicados
+            ingest.submit(Sale(pid, worker * SALES_PER_PRODUCER + n, n))
+
+    def churn():
+        noop = lambda data: None
+        while not stop_churn.is_set():
+            dispatcher.subscribe("SALES_ADDED_BATCH", noop)
+            dispatcher.unsubscribe("SALES_ADDED_BATCH", noop)
+
+    threads = [threading.Thread(target=producer, args=(w,)) for w in range(PRODUCERS)]
+    churners = [threading.Thread(target=churn) for _ in range(2)]
+    for thread in threads + churners:
+        thread.start()
+
+    started = time.perf_counter()
+    await loop.run_in_executor(None, start_barrier.wait)
+    await asyncio.wait_for(done.wait(), timeout=120)
+    elapsed = time.perf_counter() - started
+
+    stop_churn.set()
+    for thread in threads + churners:
+        thread.join()
+
+    prices = sorted(sale.price_cents for sale in data_store.get_sales())
+    ids = {sale.id for sale in data_store.get_sales()}
+    stats = data_store.get_stats()
+
+    assert prices == list(range(TOTAL)), "Ventas perdidas o duplicadas"
+    assert len(ids) == TOTAL, "Ids de venta repetidos"
+    assert stats.count == TOTAL
+    assert round(stats.total * 100) == TOTAL * (TOTAL - 1) // 2
+    assert ingest.pending() == 0
+
+    print(f"✅ {PRODUCERS} productores x {SALES_PER_PRODUCER} ventas = {TOTAL} ventas")
+    print(f"   {elapsed:.2f}s ({TOTAL / elapsed:,.0f} ventas/s), {len(batches)} lotes despachados")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""
+Prueba de carga del pipeline almacén + dispatcher con el generador de carga.
+
+Ejecuta un programa de carga sin interfaz y muestra, por etapa, la tasa
+objetivo frente a la lograda; la primera etapa donde la lograda se queda
+atrás marca el punto de saturación.
+
+Antes comprueba que una etapa lenta no se salte las siguientes (una
+llegada sorteada con la tasa de una etapa no debe caer más allá de ella)
+ni una rampa que parte de una tasa baja.
+
+Uso: python -m benchmarks.load_test [programa] [perfil] [semilla]
+     python -m benchmarks.load_test "1000:5,10000:5,50000:5,100000:5" poisson 1
+"""
+
+import os
+import sys
+
+SCHEDULE = sys.argv[1] if len(sys.argv) > 1 else "1000:5,10000:5,30000:5,60000:5"
+PROFILE = sys.argv[2] if len(sys.argv) > 2 else "poisson"
+SEED = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+os.environ.setdefault("EXPENDIO_MAX_HISTORY", "10000")
+os.environ.setdefault("EXPENDIO_LOG_TO_FILE", "false")
+os.environ.setdefault("EXPENDIO_LOG_LEVEL", "WARNING")
+
+import asyncio
+
+from core import data_store, load_generator
+from events import dispatcher
+
+
+# (programa, perfil): etapas cortas tras una etapa lenta o que parte de 0
+BOUNDARY_CASES = (
+    ("0.1:1,1000:1", "constant"),
+    ("0.5:1,1000:1,0-2000:1", "bursty"),
+    ("0.2:1,0-2000:1", "poisson"),
+    ("0.01-2000:2", "constant"),
+)
+
+
+async def check_stage_boundaries():
+    """Cada etapa con tasa alta debe publicar cerca de su objetivo."""
+    for schedule, profile in BOUNDARY_CASES:
+        published = []
+        report = await load_generator.run(
+            schedule, profile=profile, seed=SEED, publish=lambda sales: published.append(len(sales))
+        )
+        assert report.elapsed >= sum(stage.duration for stage in load_generator.parse_schedule(schedule)), (
+            f"{schedule} ({profile}): el informe cubre {report.elapsed:.2f}s"
+        )
+        for stage_report in report.stages:
+            if stage_report.target < 100:
+                continue
+            ratio = stage_report.published / stage_report.target
+            assert 0.7 <= ratio <= 1.3, (
+                f"{schedule} ({profile}): etapa {stage_report.stage} publicó "
+                f"{stage_report.published} de {stage_report.target:.0f}"
+            )
+        print(f"Límites de etapa OK: {schedule} ({profile}) -> {sum(published)} ventas")
+
+
+async def run():
+    await check_stage_boundaries()
+    received = []
+    dispatcher.subscribe("SALES_ADDED_BATCH", lambda sales: received.append(len(sales)))
+    report = await load_generator.run(SCHEDULE, profile=PROFILE, seed=SEED)
+
+    print(f"{'etapa':>22} | {'objetivo/s':>12} | {'logrado/s':>12} | {'%':>6}")
+    for stage_report in report.stages:
+        stage = stage_report.stage
+        label = f"{stage.start_rate:g}-{stage.end_rate:g}/s x {stage_report.elapsed:g}s"
+        ratio = stage_report.achieved_rate / stage_report.target_rate * 100 if stage_report.target else 0
+        print(
+            f"{label:>22} | {stage_report.target_rate:>12,.0f} | "
+            f"{stage_report.achieved_rate:>12,.0f} | {ratio:>5.1f}%"
+        )
+    print(
+        f"Total: {report.published:,} ventas en {report.elapsed:.2f}s, "
+        f"retraso máximo {report.max_lag:.3f}s"
+    )
+    assert sum(received) == report.published == data_store.get_version()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
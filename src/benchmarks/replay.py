@@ -0,0 +1,53 @@
+"""
+Reproduce una sesión grabada sin interfaz e informa su latencia de punta a punta.
+
+Sirve para comparar builds con la misma carga: grabar una vez (con
+EXPENDIO_RECORD_PATH o con --record) y reproducir en cada build.
+
+Uso: python -m benchmarks.replay sesion.exps [velocidad|max]
+     python -m benchmarks.replay --record sesion.exps [programa] [semilla]
+"""
+
+import os
+import sys
+
+os.environ.setdefault("EXPENDIO_LOG_TO_FILE", "false")
+os.environ.setdefault("EXPENDIO_LOG_LEVEL", "WARNING")
+
+import asyncio
+
+from core import load_generator, session, sources
+
+
+async def record(path, schedule, seed):
+    recorder = session.SessionRecorder(path)
+    recorder.start()
+    report = await load_generator.run(schedule, seed=seed)
+    recorder.stop()
+    print(f"Grabadas {recorder.recorded:,} ventas ({report.achieved_rate:,.0f}/s) en {path}")
+
+
+async def replay(path, speed):
+    source = sources.ReplaySource(path, speed)
+    report = await source.run()
+    print(
+        f"{report.events:,} eventos / {report.sales:,} ventas en {report.elapsed:.2f}s "
+        f"(sesión de {report.recorded:.2f}s, velocidad {'max' if speed == 0 else speed})"
+    )
+    for label, summary in (("punta a punta", report.latency), ("procesamiento", report.processing)):
+        print(
+            f"  {label:>14}: p50 {summary['p50_us']:.1f}µs | p95 {summary['p95_us']:.1f}µs | "
+            f"p99 {summary['p99_us']:.1f}µs | max {summary['max_us']:.1f}µs"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--record":
+        schedule = sys.argv[3] if len(sys.argv) > 3 else "100:2,2000:2,100:2"
+        seed = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+        asyncio.run(record(sys.argv[2], schedule, seed))
+    elif len(sys.argv) > 1:
+        speed = sys.argv[2] if len(sys.argv) > 2 else "1"
+        asyncio.run(replay(sys.argv[1], 0.0 if speed == "max" else float(speed)))
+    else:
+        print(__doc__)
@@ -0,0 +1,108 @@
+"""
+Compara la ingesta de ventas JSON en un solo proceso contra trabajadores
+que parsean en procesos aparte y entregan por anillos en memoria compartida.
+
+Además del throughput se informa el tiempo de CPU del proceso principal
+por venta: es lo que la ingesta le quita al render de la UI.
+
+Uso: python -m benchmarks.shm_ingest_bench [ventas] [trabajadores...]
+     python -m benchmarks.shm_ingest_bench 400000 1 2 4
+"""
+
+import os
+import sys
+
+TOTAL = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+WORKER_COUNTS = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4]
+
+os.environ.setdefault("EXPENDIO_LOG_TO_FILE", "false")
+os.environ.setdefault("EXPENDIO_LOG_LEVEL", "WARNING")
+
+import asyncio
+import json
+import random
+import time
+
+from core import data_store, shm_ingest, sources
+from core.updater import PRODUCTS
+
+
+def build_payload(count, seed):
+    rng = random.Random(seed)
+    return b"".join(
+        json.dumps({
+            "producto": rng.choice(PRODUCTS),
+            "centavos": rng.randint(150, 1599),
+            "timestamp": 1_700_000_000 + index // 100,
+        }).encode("utf-8") + b"\n"
+        for index in range(count)
+    )
+
+
+def _bench_worker(ring_name, ring_lock, capacity, count, seed, go):
+    ring = shm_ingest.SalesRing(capacity, name=ring_name, lock=ring_lock)
+    lines = build_payload(count, seed).splitlines()
+    go.wait()
+    for start in range(0, len(lines), 1000):
+        batch = [sources.parse_sale(line) for line in lines[start:start + 1000]]
+        shm_ingest.write_blocking(ring, batch)
+    ring.close()
+
+
+async def single_process():
+    payload = build_payload(TOTAL, 0)
+    source = sources.StdinSource()  # Solo se usa feed(): el parseo y la publicación comunes
+    chunks = [payload[offset:offset + sources.READ_CHUNK] for offset in range(0, len(payload), sources.READ_CHUNK)]
+    before = data_store.get_version()
+    started, cpu_started = time.perf_counter(), time.process_time()
+    pending = b""
+    for chunk in chunks:
+        pending = await source.feed(pending + chunk, "bench")
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    assert data_store.get_version() - before == TOTAL
+    return elapsed, cpu
+
+
+def multi_process(workers):
+    context = shm_ingest.CONTEXT
+    ingest = shm_ingest.ShmIngest(workers)
+    go = context.Event()
+    per_worker = TOTAL // workers
+    processes = []
+    for index in range(workers):
+        ring = ingest.add_ring()
+        process = context.Process(
+            target=_bench_worker, args=(ring.name, ring.lock, ring.capacity, per_worker, index, go)
+        )
+        process.start()
+        processes.append(process)
+    time.sleep(2.0)  # Que los trabajadores arranquen y preparen su carga
+
+    before = data_store.get_version()
+    started, cpu_started = time.perf_counter(), time.process_time()
+    go.set()
+    while ingest.drained < per_worker * workers:
+        if ingest.drain_once() == 0:
+            time.sleep(0.0005)
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    for process in processes:
+        process.join()
+    ingest.stop()
+    assert data_store.get_version() - before == per_worker * workers
+    return elapsed, cpu, per_worker * workers
+
+
+def report(label, count, elapsed, cpu):
+    print(
+        f"{label:>26}: {count / elapsed:>10,.0f} ventas/s | "
+        f"CPU del proceso principal {cpu / count * 1e6:6.2f} µs/venta"
+    )
+
+
+if __name__ == "__main__":
+    print(f"{TOTAL:,} ventas JSON, {os.cpu_count()} CPU")
+    elapsed, cpu = asyncio.run(single_process())
+    report("un proceso (parse + store)", TOTAL, elapsed, cpu)
+    for workers in WORKER_COUNTS:
+        elapsed, cpu, count = multi_process(workers)
+        report(f"{workers} trabajador(es) + anillo", count, elapsed, cpu)
@@ -1,29 +1,375 @@
 """
 Almacén de datos para las ventas recientes.
-Mantiene un historial limitado de ventas.
+Mantiene un historial limitado de ventas en un buffer circular
+junto con sus agregados (count, suma, media, mínimo y máximo), un
+índice por producto (ver core.product_index) y un índice de ingresos
+por minuto/hora/día (ver core.rollups).
+
+Cada venta recibe un id secuencial que además sirve como versión del
+almacén: get_sales_since(version) devuelve solo lo que cambió.
+
+Opcionalmente persiste cada venta en un journal binario (ver core.journal)
+desde el que se reconstruye al arrancar.
+
+Las escrituras y las lecturas compuestas se serializan con un lock, así
+que es seguro llamarlo desde varios hilos; para ingesta multi-productor
+ver core.ingest.
 """
 
+import asyncio
+import operator
+import threading
+from itertools import islice
+from typing import NamedTuple
+from core import journal
+from core.product_index import ProductIndex
+from core.rollups import TimeRollup
+from core.sale import Sale, product_names
+from core.sales_buffer import SalesBuffer
+from core.sales_stats import RunningAggregates
 from infrastructure.config import Config
 from infrastructure.logger import logger
 
-sales_history = []
+
+class SalesDelta(NamedTuple):
+    """Cambios del historial desde una versión dada."""
+    version: int     # Versión actual, para la próxima consulta
+    added: list      # Ventas nuevas, más reciente primero
+    evicted: list    # Ids de ventas desalojadas
+    reset: bool      # True si hay que descartar el estado y usar `added` completo
+
+
+sales_history = SalesBuffer(Config.MAX_SALES_HISTORY)
+_aggregates = RunningAggregates()
+_products = ProductIndex()
+_rollup = TimeRollup()
+_sequence = 0
+_reset_version = 0  # Versión del último clear_sales()
+_journal = None
+_rollup_rebuild = None  # Tarea que completa el índice temporal tras abrir el journal
+_lock = threading.RLock()
+ROLLUP_RESTORE_CHUNK = 65536  # Registros del journal por tramo al reconstruir el índice temporal
+
+def _append(sale):
+    """
+    Inserta una venta ya identificada, actualizando los agregados.
+
+    El buffer va primero: si rechaza la venta (campo fuera de rango) los
+    índices quedan intactos.
+    """
+    removed_sale = sales_history.append(sale)
+    _aggregates.add(sale.id, sale.price_cents)
+    _products.add(sale.product_id, sale.price_cents, sale.id)
+    _rollup.add(sale.timestamp, sale.price_cents)
+    if removed_sale is not None:
+        _aggregates.remove_oldest(removed_sale.id, removed_sale.price_cents)
+        _products.remove(removed_sale.product_id, removed_sale.price_cents)
+    return removed_sale
 
 def add_sale(sale):
-    """Añade una nueva venta al historial."""
-    sales_history.insert(0, sale)
-    if len(sales_history) > Config.MAX_SALES_HISTORY:
-        removed_sale = sales_history.pop()
-        logger.debug(f"🗑️ Venta removida del historial: {removed_sale['producto']}")
-    
+    """Añade una nueva venta (Sale) al historial y le asigna su id."""
+    global _sequence
+    with _lock:
+        sale.id = _sequence + 1
+        removed_sale = _append(sale)
+        _sequence = sale.id
+        if _journal is not None:
+            _journal.append(sale)
+    if removed_sale is not None:
+        logger.debug(f"🗑️ Venta removida del historial: {removed_sale.producto}")
+
     logger.debug(f"📝 Venta añadida al almacén. Total: {len(sales_history)}")
+    return sale
+
+def add_sales(sales):
+    """
+    Añade un lote de ventas en una sola operación.
+
+    Devuelve la lista de ventas añadidas (en orden de llegada) con sus ids.
+    Si una venta no cabe en el historial se lanza la excepción y las
+    anteriores del lote quedan añadidas.
+    """
+    global _sequence
+    added = []
+    with _lock:
+        for sale in sales:
+            sale.id = _sequence + 1
+            _append(sale)
+            _sequence = sale.id
+            if _journal is not None:
+                _journal.append(sale)
+            added.append(sale)
+
+    logger.debug(f"📝 Lote de {len(added)} ventas añadido al almacén. Total: {len(sales_history)}")
+    return added
+
+def add_sales_columns(product_ids, prices, timestamps, presorted=False):
+    """
+    Añade un lote dado por columnas paralelas (más antigua primero) sin crear objetos Sale.
+
+    Es la vía para volúmenes grandes (ver updater.generate_sales_columns):
+    las ventas que el propio lote desalojaría nunca entran al historial,
+    los agregados se actualizan por tramos y, con `presorted=True`
+    (timestamps no decrecientes), el índice de tiempo también.
+    Devuelve el id de la primera venta añadida (0 si el lote está vacío).
+    """
+    global _sequence
+    count = len(prices)
+    if count == 0:
+        return 0
+    with _lock:
+        first_id = _sequence + 1
+        capacity = sales_history.capacity
+        skip = max(0, count - capacity)
+        kept = slice(skip, count)
+        evicted = len(sales_history) + (count - skip) - capacity
+        reset = evicted >= len(sales_history)
+        removed = sales_history.after(0, evicted) if 0 < evicted and not reset else []
+
+        # El buffer valida los rangos antes de escribir: si rechaza el lote
+        # no se ha tocado nada. Un lote que lo llena entero sobrescribe todo
+        kept_prices = prices[kept]
+        kept_products = product_ids[kept]
+        sales_history.extend(
+            range(first_id + skip, first_id + count),
+            kept_products,
+            kept_prices,
+            timestamps[kept],
+        )
+        _sequence += count
+        if _journal is not None:
+            _journal.append_columns(first_id, product_ids, prices, timestamps)
+        _rollup.add_many(timestamps, prices, presorted)
+
+        if reset:
+            _aggregates.reset()
+            _products.clear()
+        for sale in removed:
+            _aggregates.remove_oldest(sale.id, sale.price_cents)
+            _products.remove(sale.product_id, sale.price_cents)
+        _aggregates.add_many(first_id + skip, kept_prices)
+        _products.add_many(kept_products, kept_prices, first_id + skip)
+
+    logger.debug(f"📝 Lote columnar de {count} ventas añadido al almacén. Total: {len(sales_history)}")
+    return first_id
 
 def get_sales():
+    """Obtiene una vista de solo lectura del historial (más reciente primero)."""
+    return sales_history.view()
+
+def get_sales_snapshot():
     """Obtiene una copia del historial de ventas."""
-    return sales_history.copy()
+    with _lock:
+        return list(sales_history)
+
+def get_sales_after(sale_id, limit):
+    """
+    Obtiene hasta `limit` ventas con id mayor que `sale_id` (más antigua primero).
+
+    Permite recorrer el historial por tramos sin copiarlo entero.
+    """
+    with _lock:
+        return sales_history.after(sale_id, limit)
+
+def get_sales_page(offset, limit):
+    """
+    Obtiene (total retenido, hasta `limit` ventas desde la posición `offset`).
+
+    Las posiciones cuentan desde la más reciente (0); permite mostrar solo
+    la porción visible de un historial grande.
+    """
+    with _lock:
+        return len(sales_history), sales_history[offset:offset + limit]
+
+def search_sales(query, limit, after=0):
+    """
+    Busca ventas retenidas por id ("#123" o "123") o por parte del nombre
+    del producto, sin distinguir mayúsculas.
+
+    Devuelve hasta `limit` ventas, más reciente primero, con id mayor que
+    `after` (para buscar solo entre las llegadas desde una versión). Por
+    nombre se usan los ids de venta del índice por producto, así que el
+    coste no depende del tamaño del historial.
+    """
+    text = query.strip().lower()
+    if text.lstrip("#").isdigit():
+        with _lock:
+            sale = sales_history.find(int(text.lstrip("#")))
+        return [sale] if sale is not None and sale.id > after else []
+    if not text:
+        with _lock:
+            return sales_history.recent(limit, after)
+    # Los nombres solo se añaden, así que se filtran sin tomar el lock
+    products = [pid for pid, name in enumerate(product_names()) if text in name.lower()]
+    with _lock:
+        return [sales_history.find(sale_id) for sale_id in _products.recent_sale_ids(products, limit, after)]
+
+def get_version():
+    """Obtiene la versión actual del almacén (id de la última venta)."""
+    return _sequence
+
+def get_sales_since(version):
+    """
+    Obtiene las ventas añadidas y los ids desalojados desde `version`.
+
+    El coste es proporcional al cambio. Si la versión es anterior a un
+    clear_sales() o más antigua que la ventana retenida, devuelve el
+    historial completo con reset=True.
+    """
+    with _lock:
+        return _delta_since(version)
+
+def _delta_since(version):
+    current = _sequence
+    if version == current:
+        return SalesDelta(current, [], [], False)
+
+    capacity = sales_history.capacity
+    if version > current or version < _reset_version or current - version >= capacity:
+        return SalesDelta(current, list(sales_history), [], True)
+
+    added = []
+    for sale in sales_history:
+        if sale.id <= version:
+            break
+        added.append(sale)
+
+    # Desde el último reset los ids son contiguos, así que lo desalojado
+    # es el rango entre el más antiguo de entonces y el más antiguo de ahora
+    oldest_then = max(_reset_version + 1, version - capacity + 1)
+    oldest_now = current - len(sales_history) + 1
+    evicted = list(range(oldest_then, oldest_now))
+
+    return SalesDelta(current, added, evicted, False)
+
+def get_stats():
+    """Obtiene los agregados del historial en O(1)."""
+    with _lock:
+        return _aggregates.snapshot()
+
+def get_product_totals(pid):
+    """Obtiene count e ingresos de un producto en el historial."""
+    with _lock:
+        return _products.get(pid)
+
+def get_top_products(n, by="revenue"):
+    """Obtiene los n productos más vendidos por ingresos o por cantidad."""
+    with _lock:
+        return _products.top(n, by)
+
+def get_period_totals(start, end):
+    """
+    Obtiene count y total de las ventas con timestamp en [start, end).
+
+    Usa el índice de buckets de tiempo, con resolución de un minuto.
+    """
+    with _lock:
+        return _rollup.range_totals(int(start), int(end))
 
 def clear_sales():
     """Limpia el historial de ventas."""
-    global sales_history
-    count = len(sales_history)
-    sales_history = []
+    global _sequence, _reset_version
+    with _lock:
+        count = len(sales_history)
+        sales_history.clear()
+        _sequence += 1
+        _reset_version = _sequence
+        if _journal is not None:
+            _journal.append_clear(_reset_version)
+        _aggregates.reset()
+        _products.clear()
+        _rollup.clear()
     logger.info(f"🧹 Historial limpiado. {count} ventas removidas")
+
+def _restore(records, last_id=0):
+    """
+    Carga registros del journal (orden cronológico) en el historial.
+
+    `last_id` es el mayor id registrado (venta o clear): la secuencia
+    continúa desde él aunque el journal termine en un clear_sales().
+    """
+    global _sequence, _reset_version
+    with _lock:
+        for sale_id, timestamp, cents, pid in records:
+            _append(Sale(pid, cents, timestamp, sale_id))
+            _sequence = max(_sequence, sale_id)
+        _sequence = max(_sequence, last_id)
+        # Las versiones previas al arranque (o al último clear) reciben el
+        # historial completo; desde ahí los ids restaurados son contiguos y
+        # sus desalojos se informan como los de cualquier venta
+        _reset_version = records[0][0] - 1 if records else _sequence
+
+def _load_rollup(path, before_id):
+    """
+    Construye un índice temporal con los registros del journal anteriores
+    a `before_id`, leídos por tramos.
+
+    El historial solo retiene la cola, pero los buckets cubren todo lo
+    ingresado desde el último clear_sales() dentro de su retención.
+    """
+    rollup = TimeRollup()
+    for records in journal.iter_records(path, ROLLUP_RESTORE_CHUNK, keep_clears=True):
+        timestamps = []
+        prices = []
+        finished = False
+        for sale_id, timestamp, cents, pid in records:
+            if sale_id >= before_id:
+                finished = True
+                break
+            if pid == journal.CLEAR_MARKER:
+                timestamps, prices = [], []
+                rollup.clear()
+                continue
+            timestamps.append(timestamp)
+            prices.append(cents)
+        presorted = all(map(operator.le, timestamps, islice(timestamps, 1, None)))
+        rollup.add_many(timestamps, prices, presorted)
+        if finished:
+            break
+    return rollup
+
+async def _rebuild_rollup(path, before_id, reset_version):
+    """
+    Completa en segundo plano el índice temporal con lo anterior a la cola restaurada.
+
+    Mientras tanto el índice vivo tiene la cola y las ventas nuevas; al
+    terminar se suman ambos bajo el lock.
+    """
+    global _rollup
+    rollup = await asyncio.to_thread(_load_rollup, path, before_id)
+    with _lock:
+        if _reset_version != reset_version:
+            return  # Un clear_sales() posterior descartó todo lo reconstruido
+        rollup.merge(_rollup)
+        _rollup = rollup
+    logger.info("♻️ Índice de ingresos por periodo reconstruido desde el journal")
+
+async def open_journal(path):
+    """
+    Reconstruye el historial desde el journal y activa la persistencia.
+
+    Solo se lee la cola que cabe en el historial; el índice temporal de
+    periodos anteriores se completa después en segundo plano, para que el
+    arranque no dependa del tamaño del journal.
+    """
+    global _journal, _rollup_rebuild
+    # La lectura y apertura de archivos van en un hilo para no bloquear el loop
+    records, last_id = await asyncio.to_thread(journal.read_tail, path, sales_history.capacity)
+    _restore(records, last_id)
+    if records:
+        # Sin registros vigentes el journal termina en un clear: no hay nada que sumar
+        _rollup_rebuild = asyncio.create_task(_rebuild_rollup(path, records[0][0], _reset_version))
+    _journal = await asyncio.to_thread(
+        journal.JournalWriter,
+        path,
+        Config.JOURNAL_BATCH_SIZE,
+        Config.JOURNAL_FLUSH_INTERVAL
+    )
+    logger.info(f"♻️ Historial restaurado desde el journal: {len(records)} ventas")
+
+def close_journal():
+    """Escribe lo pendiente y desactiva la persistencia."""
+    global _journal
+    if _journal is not None:
+        _journal.close()
+        _journal = None
@@ -0,0 +1,160 @@
+"""
+Exportación del historial de ventas a CSV, JSON Lines o formato columnar.
+
+Las ventas fluyen por tramos a través de generadores (origen -> escritor),
+así que la memoria usada no depende del tamaño del historial. Las
+exportaciones largas se ejecutan en un hilo con export_sales_async().
+
+El formato columnar ("EXPC") guarda cada tramo como columnas binarias
+contiguas y un pie con el catálogo de productos:
+
+    MAGIC
+    por tramo: n (uint32) | ids (int64 * n) | timestamps (int64 * n)
+               | centavos (int64 * n) | productos (uint32 * n)
+    pie: catálogo JSON | longitud del catálogo (uint64) | MAGIC
+"""
+
+import asyncio
+import csv
+import json
+import struct
+from array import array
+
+from core import data_store, journal
+from core.sale import Sale, product_name
+from infrastructure.config import Config
+from infrastructure.logger import logger
+
+DEFAULT_CHUNK_SIZE = 4096
+FORMATS = ("csv", "jsonl", "columnar")
+CSV_FIELDS = ("id", "producto", "precio", "hora", "timestamp")
+COLUMNAR_MAGIC = b"EXPC\x01\x00\x00\x00"
+
+def iter_store_chunks(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recorre el historial en memoria por tramos, de la venta más antigua a la más reciente."""
+    last_id = 0
+    while True:
+        # Cada tramo se pide por separado (y bajo el lock del almacén),
+        # así la ingesta puede continuar entre tramos
+        chunk = data_store.get_sales_after(last_id, chunk_size)
+        if not chunk:
+            return
+        last_id = chunk[-1].id
+        yield chunk
+
+def iter_journal_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recorre todas las ventas persistidas en el journal por tramos."""
+    for records in journal.iter_records(path, chunk_size):
+        yield [Sale(pid, cents, timestamp, sale_id) for sale_id, timestamp, cents, pid in records]
+
+def write_csv(chunks, output):
+    """Escribe los tramos como CSV en un archivo de texto abierto."""
+    writer = csv.writer(output)
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for chunk in chunks:
+        writer.writerows(
+            (sale.id, sale.producto, f"{sale.precio:.2f}", sale.hora, sale.timestamp)
+            for sale in chunk
+        )
+        count += len(chunk)
+    return count
+
+def write_jsonl(chunks, output):
+    """Escribe los tramos como JSON Lines en un archivo de texto abierto."""
+    count = 0
+    for chunk in chunks:
+        output.write("".join(json.dumps(sale.to_dict(), ensure_ascii=False) + "\n" for sale in chunk))
+        count += len(chunk)
+    return count
+
+def write_columnar(chunks, output):
+    """Escribe los tramos en formato columnar binario en un archivo binario abierto."""
+    output.write(COLUMNAR_MAGIC)
+    product_ids = set()
+    count = 0
+    for chunk in chunks:
+        ids = array("q", (sale.id for sale in chunk))
+        timestamps = array("q", (sale.timestamp for sale in chunk))
+        prices = array("q", (sale.price_cents for sale in chunk))
+        products = array("I", (sale.product_id for sale in chunk))
+        product_ids.update(products)
+        output.write(struct.pack("<I", len(chunk)))
+        for column in (ids, timestamps, prices, products):
+            output.write(column.tobytes())
+        count += len(chunk)
+
+    catalog = json.dumps(
+        {str(pid): product_name(pid) for pid in sorted(product_ids)},
+        ensure_ascii=False
+    ).encode("utf-8")
+    output.write(catalog)
+    output.write(struct.pack("<Q", len(catalog)))
+    output.write(COLUMNAR_MAGIC)
+    return count
+
+def read_columnar(path):
+    """Lee un archivo columnar y recorre sus ventas por tramos (útil para verificar exportaciones)."""
+    with open(path, "rb") as source:
+        source.seek(-(8 + len(COLUMNAR_MAGIC)), 2)
+        footer_start = source.tell()
+        (catalog_length,) = struct.unpack("<Q", source.read(8))
+        source.seek(footer_start - catalog_length)
+        catalog = {int(pid): name for pid, name in json.loads(source.read(catalog_length)).items()}
+        data_end = footer_start - catalog_length
+
+        source.seek(0)
+        if source.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"Archivo columnar inválido: {path}")
+        while source.tell() < data_end:
+            (count,) = struct.unpack("<I", source.read(4))
+            columns = []
+            for typecode in ("q", "q", "q", "I"):
+                column = array(typecode)
+                column.frombytes(source.read(column.itemsize * count))
+                columns.append(column)
+            yield [
+                {"id": sale_id, "producto": catalog[pid], "precio": cents / 100, "timestamp": timestamp}
+                for sale_id, timestamp, cents, pid in zip(*columns)
+            ]
+
+_WRITERS = {
+    "csv": (write_csv, "w"),
+    "jsonl": (write_jsonl, "w"),
+    "columnar": (write_columnar, "wb"),
+}
+
+def export_sales(path, fmt="csv", source="store", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Exporta las ventas a `path`.
+
+    source="store" exporta el historial en memoria; source="journal"
+    exporta todo lo persistido en el journal configurado.
+    Devuelve el número de ventas escritas.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}. Opciones: {', '.join(FORMATS)}")
+
+    if source == "store":
+        chunks = iter_store_chunks(chunk_size)
+    elif source == "journal":
+        if not Config.JOURNAL_PATH:
+            raise ValueError("No hay journal configurado (EXPENDIO_JOURNAL_PATH)")
+        chunks = iter_journal_chunks(Config.JOURNAL_PATH, chunk_size)
+    else:
+        raise ValueError(f"Origen de exportación desconocido: {source}")
+
+    writer, mode = _WRITERS[fmt]
+    if mode == "w":
+        with open(path, mode, encoding="utf-8", newline="") as output:
+            count = writer(chunks, output)
+    else:
+        with open(path, mode) as output:
+            count = writer(chunks, output)
+
+    logger.info(f"📤 Exportadas {count} ventas ({fmt}, origen {source}) a {path}")
+    return count
+
+async def export_sales_async(path, fmt="csv", source="store", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Igual que export_sales pero en un hilo, sin bloquear el loop de la UI."""
+    return await asyncio.to_thread(export_sales, path, fmt, source, chunk_size)
@@ -0,0 +1,88 @@
+"""
+Ingesta concurrente de ventas desde varios hilos productores.
+
+Los productores (escáner, terminal de pago, listener de red...) llaman a
+submit() desde cualquier hilo: encolar no toma locks del almacén. Un
+único consumidor en el loop de asyncio drena la cola por lotes hacia el
+data_store y despacha los eventos, así que la UI solo se toca desde su loop.
+"""
+
+import asyncio
+import queue
+import threading
+
+from core import updater
+from infrastructure.logger import logger
+
+MAX_DRAIN_BATCH = 1000
+
+_queue = queue.SimpleQueue()
+_loop = None
+_schedule_lock = threading.Lock()
+_drain_scheduled = False
+
+def start(loop=None):
+    """Asocia la ingesta al loop de asyncio que consumirá la cola."""
+    global _loop
+    _loop = loop or asyncio.get_running_loop()
+    logger.info("📥 Ingesta concurrente de ventas iniciada")
+    if not _queue.empty():
+        _schedule_drain()
+
+def stop():
+    """Desasocia el loop; las ventas siguientes quedan encoladas hasta el próximo start()."""
+    global _loop
+    _loop = None
+
+def submit(sale):
+    """Encola una venta desde cualquier hilo."""
+    _queue.put(sale)
+    _schedule_drain()
+
+def submit_many(sales):
+    """Encola varias ventas con un único aviso al consumidor."""
+    for sale in sales:
+        _queue.put(sale)
+    _schedule_drain()
+
+def pending():
+    """Número aproximado de ventas esperando al consumidor."""
+    return _queue.qsize()
+
+def _schedule_drain():
+    """Programa un drenado en el loop si no hay uno pendiente."""
+    global _drain_scheduled
+    loop = _loop
+    if loop is None:
+        return
+    with _schedule_lock:
+        if _drain_scheduled:
+            return
+        _drain_scheduled = True
+    try:
+        loop.call_soon_threadsafe(_drain)
+    except RuntimeError:
+        # El loop se cerró; lo encolado espera a un nuevo start()
+        with _schedule_lock:
+            _drain_scheduled = False
+
+def _drain():
+    """Consumidor: mueve lo encolado al almacén en lotes (corre en el loop)."""
+    global _drain_scheduled
+    # Se libera antes de drenar: una venta encolada a partir de aquí
+    # programa otro drenado en lugar de quedar olvidada
+    with _schedule_lock:
+        _drain_scheduled = False
+
+    batch = []
+    try:
+        while len(batch) < MAX_DRAIN_BATCH:
+            batch.append(_queue.get_nowait())
+    except queue.Empty:
+        pass
+
+    if batch:
+        updater.publish_sales(batch)
+    if len(batch) == MAX_DRAIN_BATCH:
+        # Ceder el loop entre lotes para que la UI siga respondiendo
+        _schedule_drain()
@@ -0,0 +1,260 @@
+"""
+Journal binario append-only de ventas.
+
+Cada venta ocupa un registro de tamaño fijo, así que el arranque en
+caliente solo lee (vía mmap) la cola del archivo que cabe en el
+historial, sin importar cuántas ventas contenga; el índice temporal de
+ingresos se completa después, en segundo plano, recorriendo el archivo
+por tramos (iter_records).
+Las escrituras se agrupan en un hilo dedicado que hace un fsync por lote.
+
+Los nombres de producto van en un archivo paralelo `<journal>.products`
+con ids propios del journal, estables entre ejecuciones.
+"""
+
+import atexit
+import mmap
+import os
+import struct
+import threading
+
+from core.sale import product_id, product_name
+from infrastructure.logger import logger
+
+MAGIC = b"EXPJ\x01\x00\x00\x00"
+# id, timestamp, centavos, id de producto del journal
+RECORD = struct.Struct("<qqqi")
+# Marca de clear_sales(): todo lo anterior queda descartado
+CLEAR_MARKER = -1
+
+
+def _products_path(path):
+    return path + ".products"
+
+
+def _load_product_names(path):
+    """Lee el catálogo de productos del journal (id del journal -> nombre)."""
+    names = {}
+    try:
+        with open(_products_path(path), "r", encoding="utf-8") as products_file:
+            for line in products_file:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                jid, name = line.split("\t", 1)
+                names[int(jid)] = name
+    except FileNotFoundError:
+        pass
+    return names
+
+
+def iter_records(path, chunk_size, keep_clears=False):
+    """
+    Recorre el journal completo en tramos de hasta `chunk_size` registros.
+
+    Cada tramo es una lista de tuplas (id, timestamp, centavos, product_id
+    local) en orden cronológico; las marcas de clear se omiten salvo con
+    keep_clears, que las entrega con CLEAR_MARKER como producto. La memoria
+    usada no depende del tamaño del archivo.
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+    record_count = (size - len(MAGIC)) // RECORD.size
+    if record_count <= 0:
+        return
+
+    local_ids = {jid: product_id(name) for jid, name in _load_product_names(path).items()}
+    if keep_clears:
+        local_ids[CLEAR_MARKER] = CLEAR_MARKER
+    with open(path, "rb") as journal_file:
+        with mmap.mmap(journal_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Journal inválido: {path}")
+            for first in range(0, record_count, chunk_size):
+                begin = len(MAGIC) + first * RECORD.size
+                end = len(MAGIC) + min(record_count, first + chunk_size) * RECORD.size
+                with memoryview(mapped)[begin:end] as chunk:
+                    records = [
+                        (sale_id, timestamp, cents, local_ids[jid])
+                        for sale_id, timestamp, cents, jid in RECORD.iter_unpack(chunk)
+                        if jid in local_ids
+                    ]
+                if records:
+                    yield records
+
+
+def read_tail(path, count):
+    """
+    Lee como máximo los últimos `count` registros vigentes del journal.
+
+    Devuelve (registros, último id): los registros son tuplas (id,
+    timestamp, centavos, product_id local) en orden cronológico,
+    posteriores al último clear registrado; el último id es el mayor id de
+    venta o de clear del archivo, para no reutilizar ids al continuar. Un
+    registro final incompleto (escritura interrumpida) se ignora.
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return [], 0
+    record_count = (size - len(MAGIC)) // RECORD.size
+    if record_count <= 0:
+        return [], 0
+
+    # Ids del journal -> ids de producto de este proceso
+    local_ids = {jid: product_id(name) for jid, name in _load_product_names(path).items()}
+
+    start = max(0, record_count - count)
+    with open(path, "rb") as journal_file:
+        with mmap.mmap(journal_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Journal inválido: {path}")
+            begin = len(MAGIC) + start * RECORD.size
+            end = len(MAGIC) + record_count * RECORD.size
+            with memoryview(mapped)[begin:end] as tail:
+                raw = list(RECORD.iter_unpack(tail))
+
+    # Los ids crecen en el journal: el mayor está en la cola leída
+    last_id = max(record[0] for record in raw)
+    for index in range(len(raw) - 1, -1, -1):
+        if raw[index][3] == CLEAR_MARKER:
+            raw = raw[index + 1:]
+            break
+
+    records = [
+        (sale_id, timestamp, cents, local_ids[jid])
+        for sale_id, timestamp, cents, jid in raw
+        if jid in local_ids
+    ]
+    return records, last_id
+
+
+class JournalWriter:
+    """Escritor en segundo plano con escrituras por lotes y fsync amortizado."""
+
+    def __init__(self, path, batch_size=512, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._products_dirty = False
+
+        self._product_jids = {}  # id local -> id del journal
+        self._next_jid = 0
+        for jid, name in _load_product_names(path).items():
+            self._product_jids[product_id(name)] = jid
+            self._next_jid = max(self._next_jid, jid + 1)
+
+        self._file = self._open_journal(path)
+        self._products_file = open(_products_path(path), "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="sales-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+        logger.info(f"💾 Journal de ventas abierto: {path}")
+
+    @staticmethod
+    def _open_journal(path):
+        """Abre el journal para añadir, creando la cabecera o recortando un registro incompleto."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        journal_file = open(path, "ab")
+        size = journal_file.tell()
+        if size == 0:
+            journal_file.write(MAGIC)
+        else:
+            misaligned = (size - len(MAGIC)) % RECORD.size
+            if misaligned:
+                journal_file.truncate(size - misaligned)
+                logger.warning(f"⚠️ Journal con registro incompleto, recortados {misaligned} bytes")
+        return journal_file
+
+    def _journal_product_id(self, pid):
+        jid = self._product_jids.get(pid)
+        if jid is None:
+            jid = self._next_jid
+            self._next_jid += 1
+            self._product_jids[pid] = jid
+            self._products_file.write(f"{jid}\t{product_name(pid)}\n")
+            self._products_file.flush()
+            self._products_dirty = True
+        return jid
+
+    def _enqueue(self, packed, count=1):
+        with self._condition:
+            if self._closed:
+                return
+            self._pending += packed
+            self._pending_count += count
+            if self._pending_count >= self.batch_size:
+                self._condition.notify()
+
+    def append(self, sale):
+        """Encola una venta para escribirla en el próximo lote."""
+        jid = self._journal_product_id(sale.product_id)
+        self._enqueue(RECORD.pack(sale.id, sale.timestamp, sale.price_cents, jid))
+
+    def append_columns(self, first_id, product_ids, prices, timestamps):
+        """Encola un lote por columnas con ids consecutivos desde `first_id`."""
+        jids = {pid: self._journal_product_id(pid) for pid in set(product_ids)}
+        packed = b"".join(map(
+            RECORD.pack,
+            range(first_id, first_id + len(prices)),
+            timestamps,
+            prices,
+            map(jids.__getitem__, product_ids),
+        ))
+        self._enqueue(packed, len(prices))
+
+    def append_clear(self, reset_id):
+        """Registra un clear_sales() para que el arranque no lo deshaga."""
+        self._enqueue(RECORD.pack(reset_id, 0, 0, CLEAR_MARKER))
+
+    def _take_pending(self):
+        pending = self._pending
+        self._pending = bytearray()
+        self._pending_count = 0
+        return pending
+
+    def _write(self, data):
+        if not data:
+            return
+        # El catálogo debe ser durable antes que los registros que lo referencian
+        if self._products_dirty:
+            self._products_dirty = False
+            os.fsync(self._products_file.fileno())
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and self._pending_count < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                data = self._take_pending()
+                closed = self._closed
+            try:
+                self._write(data)
+            except OSError as e:
+                logger.error(f"💥 Error escribiendo el journal: {e}")
+            if closed:
+                return
+
+    def close(self):
+        """Escribe lo pendiente y cierra el journal."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+        self._products_file.close()
+        logger.info(f"💾 Journal de ventas cerrado: {self.path}")
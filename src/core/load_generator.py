@@ -0,0 +1,289 @@
+"""
+Generador de carga: simula ventas a tasas de fracciones a decenas de miles por segundo.
+
+La llegada de ventas sigue un perfil ("constant", "poisson" o "bursty")
+y un programa de etapas con tasa fija o rampa lineal, por ejemplo:
+
+    "1:10,100-5000:60,5000"   1 venta/s durante 10 s, rampa de 100 a 5000
+                              ventas/s en 60 s y luego 5000/s sin fin
+
+Con una semilla la secuencia de llegadas y de ventas es reproducible.
+El generador despierta cada `tick` segundos, publica de una vez todas las
+ventas cuya hora programada ya pasó (updater.publish_sales) y registra
+periódicamente la tasa lograda frente a la objetivo y el retraso respecto
+del programa: cuando el retraso crece sin parar, el pipeline está saturado.
+Las ventas se cuentan en la etapa en que se publican y lo que siga
+atrasado al acabar el programa se descarta.
+"""
+
+import asyncio
+import math
+import random
+import time
+from typing import NamedTuple
+
+from core.sale import Sale
+from infrastructure.logger import logger
+
+PROFILES = ("constant", "poisson", "bursty")
+DEFAULT_TICK = 0.01
+MAX_BATCH = 50_000       # Tope de ventas por tick para no acaparar el loop
+SATURATION_LAG = 1.0     # Segundos de retraso a partir de los que se avisa
+
+class Stage(NamedTuple):
+    """Etapa del programa de carga: rampa lineal de start_rate a end_rate."""
+    start_rate: float
+    end_rate: float
+    duration: float  # math.inf = sin fin
+
+class StageReport(NamedTuple):
+    stage: Stage
+    target: float     # Ventas esperadas según el programa
+    published: int    # Ventas publicadas
+    elapsed: float
+
+    @property
+    def target_rate(self):
+        return self.target / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def achieved_rate(self):
+        return self.published / self.elapsed if self.elapsed else 0.0
+
+class LoadReport(NamedTuple):
+    """Resultado de una ejecución del generador."""
+    elapsed: float
+    target: float
+    published: int
+    max_lag: float
+    stages: list
+
+    @property
+    def target_rate(self):
+        return self.target / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def achieved_rate(self):
+        return self.published / self.elapsed if self.elapsed else 0.0
+
+def parse_schedule(spec):
+    """
+    Interpreta un programa "tasa[:duración]" o "inicio-fin:duración" separado por comas.
+
+    Solo la última etapa puede omitir la duración (dura indefinidamente).
+    """
+    stages = []
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    if not parts:
+        raise ValueError("Programa de carga vacío")
+    for index, part in enumerate(parts):
+        rates, _, duration = part.partition(":")
+        start, _, end = rates.partition("-")
+        start_rate = float(start)
+        end_rate = float(end) if end else start_rate
+        if duration:
+            seconds = float(duration)
+        elif index == len(parts) - 1:
+            seconds = math.inf
+        else:
+            raise ValueError(f"Falta la duración de la etapa '{part}'")
+        if start_rate < 0 or end_rate < 0 or seconds <= 0:
+            raise ValueError(f"Etapa de carga inválida: '{part}'")
+        stages.append(Stage(start_rate, end_rate, seconds))
+    return stages
+
+def _stage_at(stages, offset):
+    """(índice de etapa, inicio de la etapa) para un instante del programa; None al terminar."""
+    stage_start = 0.0
+    for index, stage in enumerate(stages):
+        if offset < stage_start + stage.duration:
+            return index, stage_start
+        stage_start += stage.duration
+    return None
+
+def _rate(stage, elapsed_in_stage):
+    if stage.start_rate == stage.end_rate or math.isinf(stage.duration):
+        return stage.start_rate
+    fraction = elapsed_in_stage / stage.duration
+    return stage.start_rate + (stage.end_rate - stage.start_rate) * fraction
+
+def _expected(stage, elapsed_in_stage):
+    """Ventas esperadas en los primeros `elapsed_in_stage` segundos de la etapa."""
+    return (stage.start_rate + _rate(stage, elapsed_in_stage)) / 2 * elapsed_in_stage
+
+def _is_ramp(stage):
+    return stage.start_rate != stage.end_rate and not math.isinf(stage.duration)
+
+def _next_expected(stage, elapsed_in_stage):
+    """
+    Instante de la etapa en que las ventas esperadas suman una más que en
+    `elapsed_in_stage` (math.inf si una rampa descendente no llega).
+
+    Integra la rampa: resuelve a·x + b·x²/2 = esperadas + 1, con la raíz
+    escrita de forma estable también para pendientes pequeñas.
+    """
+    a = stage.start_rate
+    b = (stage.end_rate - stage.start_rate) / stage.duration
+    target = _expected(stage, elapsed_in_stage) + 1
+    discriminant = a * a + 2 * b * target
+    if discriminant < 0:
+        return math.inf
+    return 2 * target / (a + math.sqrt(discriminant))
+
+class ArrivalProcess:
+    """Genera llegadas sucesivas (instante, cantidad) según el perfil."""
+
+    def __init__(self, profile, rng, burst_size=20):
+        if profile not in PROFILES:
+            raise ValueError(f"Perfil de carga desconocido: {profile}. Opciones: {', '.join(PROFILES)}")
+        self.profile = profile
+        self.rng = rng
+        self.burst_size = max(1.0, burst_size)
+        # Poisson y ráfagas no tienen memoria: se puede volver a sortear
+        # desde cualquier instante (p. ej. al cambiar la tasa) sin sesgo
+        self.memoryless = profile != "constant"
+
+    def next_arrival(self, offset, rate):
+        """Siguiente llegada a partir de `offset` con la tasa actual (ventas/s)."""
+        if self.profile == "constant":
+            return offset + 1.0 / rate, 1
+        if self.profile == "poisson":
+            return offset + self.rng.expovariate(rate), 1
+        # Ráfagas: llegan como Poisson a rate/burst_size y traen un número
+        # geométrico de ventas de media burst_size, así la tasa media se mantiene
+        gap = self.rng.expovariate(rate / self.burst_size)
+        size = 1
+        if self.burst_size > 1:
+            p = 1.0 / self.burst_size
+            size = 1 + int(math.log(1.0 - self.rng.random()) / math.log(1.0 - p))
+        return offset + gap, size
+
+async def run(schedule, profile="poisson", seed=None, publish=None, products=None,
+              tick=DEFAULT_TICK, report_interval=5.0, burst_size=20):
+    """
+    Ejecuta el programa de carga y devuelve un LoadReport.
+
+    `schedule` es una lista de Stage o un texto para parse_schedule.
+    `publish` recibe cada lote de ventas (por defecto updater.publish_sales)
+    y `products` son los ids de producto a sortear.
+    """
+    from core import updater
+
+    stages = parse_schedule(schedule) if isinstance(schedule, str) else list(schedule)
+    publish = publish or updater.publish_sales
+    products = products or updater.PRODUCT_IDS
+    rng = random.Random(seed)
+    arrivals = ArrivalProcess(profile, rng, burst_size)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    wall_started = time.time()
+    stage_published = [0] * len(stages)
+
+    logger.info(
+        f"🚀 Generador de carga: perfil {profile}, semilla {seed}, etapas "
+        + ", ".join(f"{s.start_rate:g}-{s.end_rate:g}/s x {s.duration:g}s" for s in stages)
+    )
+
+    def schedule_next(offset):
+        """Primera llegada en o después de `offset` saltando etapas con tasa 0."""
+        while True:
+            located = _stage_at(stages, offset)
+            if located is None:
+                return None, 0
+            index, stage_start = located
+            stage = stages[index]
+            stage_end = stage_start + stage.duration
+            if not arrivals.memoryless and _is_ramp(stage):
+                # El perfil constante integra la rampa: aunque 1/tasa de este
+                # instante caiga fuera de la etapa, las ventas llegan cuando
+                # las esperadas suman una más
+                arrival = stage_start + _next_expected(stage, offset - stage_start)
+                if arrival < stage_end:
+                    return arrival, 1
+                offset = stage_end
+                continue
+            rate = _rate(stage, offset - stage_start)
+            if rate > 0:
+                arrival = arrivals.next_arrival(offset, rate)
+                # Una llegada sorteada con la tasa de esta etapa no puede caer
+                # en la siguiente: se vuelve a sortear desde el límite con la
+                # nueva tasa (el perfil constante reinicia ahí su fase). En
+                # una rampa sin memoria se vuelve a sortear cada tick.
+                horizon = stage_end
+                if _is_ramp(stage):
+                    horizon = min(stage_end, offset + tick)
+                if arrival[0] < horizon:
+                    return arrival
+                offset = horizon
+            elif stage.start_rate == stage.end_rate:
+                offset = stage_end
+            else:
+                # Rampa que parte de 0: avanza un tick para que la tasa suba
+                offset += tick
+
+    next_at, next_count = schedule_next(0.0)
+    total_duration = sum(stage.duration for stage in stages)
+    published = 0
+    max_lag = 0.0
+    window_started, window_published = 0.0, 0
+
+    try:
+        # Sin más llegadas el programa sigue hasta su duración: el informe
+        # cubre todo lo pedido y no se acorta a lo que llegó a publicarse
+        while next_at is not None or not math.isinf(total_duration):
+            now = loop.time() - started
+            if now >= total_duration:
+                # Lo que quede atrasado al acabar el programa no se publica:
+                # la tasa lograda refleja lo que el pipeline dio abasto
+                break
+            batch = []
+            while next_at is not None and next_at <= now and len(batch) < MAX_BATCH:
+                timestamp = int(wall_started + next_at)
+                for _ in range(next_count):
+                    batch.append(Sale(rng.choice(products), rng.randint(150, 1599), timestamp))
+                next_at, next_count = schedule_next(next_at)
+
+            if batch:
+                publish(batch)
+                published += len(batch)
+                window_published += len(batch)
+                stage_published[_stage_at(stages, now)[0]] += len(batch)
+
+            lag = max(0.0, now - next_at) if next_at is not None else 0.0
+            max_lag = max(max_lag, lag)
+
+            if now - window_started >= report_interval:
+                located = _stage_at(stages, now)
+                target_rate = _rate(stages[located[0]], now - located[1]) if located else 0.0
+                achieved = window_published / (now - window_started)
+                logger.info(
+                    f"📈 Carga: objetivo {target_rate:,.1f}/s | logrado {achieved:,.1f}/s | "
+                    f"retraso {lag:.3f}s | total {published:,}"
+                )
+                if lag > SATURATION_LAG:
+                    logger.warning(f"⚠️ Pipeline saturado: {lag:.1f}s de retraso sobre el programa")
+                window_started, window_published = now, 0
+
+            await asyncio.sleep(tick)
+    finally:
+        elapsed = min(loop.time() - started, total_duration)
+        report = _build_report(stages, stage_published, elapsed, published, max_lag)
+        logger.info(
+            f"🏁 Carga terminada: {report.published:,} ventas en {report.elapsed:.1f}s | "
+            f"objetivo {report.target_rate:,.1f}/s | logrado {report.achieved_rate:,.1f}/s | "
+            f"retraso máximo {report.max_lag:.3f}s"
+        )
+    return report
+
+def _build_report(stages, stage_published, elapsed, published, max_lag):
+    reports = []
+    stage_start = 0.0
+    for stage, count in zip(stages, stage_published):
+        if stage_start >= elapsed:
+            break
+        in_stage = min(stage.duration, elapsed - stage_start)
+        reports.append(StageReport(stage, _expected(stage, in_stage), count, in_stage))
+        stage_start += stage.duration
+    target = sum(report.target for report in reports)
+    return LoadReport(elapsed, target, published, max_lag, reports)
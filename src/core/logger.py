@@ -80,7 +80,7 @@ class AppLogger:
     
     def log_sale(self, sale):
         """Log específico para ventas."""
-        self._logger.info(f"💰 Nueva venta: {sale['producto']} - ${sale['precio']:.2f} @ {sale['hora']}")
+        self._logger.info(f"💰 Nueva venta: {sale.producto} - ${sale.precio:.2f} @ {sale.hora}")
     
     def log_ui_update(self, view_name, data_count):
         """Log específico para actualizaciones de UI."""
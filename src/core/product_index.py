@@ -0,0 +1,151 @@
+"""
+Índice de ventas por producto sobre la ventana retenida.
+Mantiene count e ingresos por producto y rankings ordenados para
+responder "más vendidos" sin recorrer el historial, y los ids de venta
+de cada producto para buscar sus ventas más recientes.
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import NamedTuple
+
+from core.sale import product_name
+
+
+class ProductTotals(NamedTuple):
+    """Ventas acumuladas de un producto."""
+    producto: str
+    count: int
+    total: float
+
+
+class ProductIndex:
+    """
+    Agregados por producto actualizados en cada alta y desalojo.
+
+    Los rankings son listas ordenadas de (-valor, product_id): cada cambio
+    quita la entrada vieja e inserta la nueva por bisección, y el top-N es
+    un slice del inicio.
+
+    Los ids de venta de cada producto van en un array creciente: las altas
+    se añaden al final y, como se desaloja siempre la venta más antigua
+    del historial, los desalojos avanzan el inicio vigente (el array se
+    compacta cuando la mitad ya no es vigente).
+    """
+
+    def __init__(self):
+        self._totals = {}  # product_id -> [count, centavos]
+        self._by_revenue = []
+        self._by_count = []
+        self._sale_ids = {}  # product_id -> [array de ids de venta, inicio vigente]
+
+    @staticmethod
+    def _discard(ranking, key):
+        position = bisect_left(ranking, key)
+        if position < len(ranking) and ranking[position] == key:
+            del ranking[position]
+
+    def _update(self, pid, count_delta, cents_delta):
+        totals = self._totals.get(pid)
+        if totals is None:
+            totals = self._totals[pid] = [0, 0]
+        else:
+            self._discard(self._by_count, (-totals[0], pid))
+            self._discard(self._by_revenue, (-totals[1], pid))
+
+        totals[0] += count_delta
+        totals[1] += cents_delta
+        if totals[0] == 0:
+            del self._totals[pid]
+            return
+        insort(self._by_count, (-totals[0], pid))
+        insort(self._by_revenue, (-totals[1], pid))
+
+    def _sale_ids_of(self, pid):
+        entry = self._sale_ids.get(pid)
+        if entry is None:
+            entry = self._sale_ids[pid] = [array("q"), 0]
+        return entry[0]
+
+    def add(self, pid, cents, sale_id):
+        """Registra una venta del producto."""
+        self._update(pid, 1, cents)
+        self._sale_ids_of(pid).append(sale_id)
+
+    def add_many(self, pids, cents, first_id):
+        """
+        Registra un lote de ventas (columnas paralelas, ids consecutivos desde
+        `first_id`) con una actualización de totales por producto.
+        """
+        totals = {}
+        for sale_id, pid, amount in zip(range(first_id, first_id + len(pids)), pids, cents):
+            entry = totals.get(pid)
+            if entry is None:
+                entry = totals[pid] = [0, 0, self._sale_ids_of(pid).append]
+            entry[0] += 1
+            entry[1] += amount
+            entry[2](sale_id)
+        for pid, (count, amount, _) in totals.items():
+            self._update(pid, count, amount)
+
+    def remove(self, pid, cents):
+        """Descuenta una venta desalojada del producto (siempre su más antigua)."""
+        self._update(pid, -1, -cents)
+        entry = self._sale_ids[pid]
+        sale_ids, start = entry
+        start += 1
+        if start == len(sale_ids):
+            del self._sale_ids[pid]
+            return
+        if start * 2 >= len(sale_ids):
+            del sale_ids[:start]
+            start = 0
+        entry[1] = start
+
+    def clear(self):
+        self._totals.clear()
+        self._by_revenue.clear()
+        self._by_count.clear()
+        self._sale_ids.clear()
+
+    def recent_sale_ids(self, pids, limit, after=0):
+        """
+        Ids de hasta `limit` ventas vigentes de los productos dados con id
+        mayor que `after`, del más reciente al más antiguo.
+
+        Mezcla las listas de cada producto desde el final: el coste depende
+        de `limit` y del número de productos, no del tamaño del historial.
+        """
+        newest_first = []
+        for pid in pids:
+            entry = self._sale_ids.get(pid)
+            if entry is not None:
+                sale_ids, start = entry
+                newest_first.append(islice(reversed(sale_ids), len(sale_ids) - start))
+        found = []
+        for sale_id in heapq.merge(*newest_first, reverse=True):
+            if sale_id <= after or len(found) >= limit:
+                break
+            found.append(sale_id)
+        return found
+
+    def get(self, pid):
+        """Totales de un producto (ceros si no tiene ventas en la ventana)."""
+        count, cents = self._totals.get(pid, (0, 0))
+        return ProductTotals(product_name(pid), count, cents / 100)
+
+    def top(self, n, by="revenue"):
+        """Los n productos con más ingresos (by="revenue") o ventas (by="count")."""
+        if by == "revenue":
+            ranking = self._by_revenue
+        elif by == "count":
+            ranking = self._by_count
+        else:
+            raise ValueError(f"Criterio de ranking desconocido: {by}")
+        return [self.get(pid) for _, pid in ranking[:n]]
+
+    def all(self):
+        """Totales de todos los productos con ventas, por ingresos."""
+        return self.top(len(self._by_revenue))
@@ -0,0 +1,155 @@
+"""
+Índice de ventas agregadas por intervalos de tiempo (minuto, hora, día).
+
+A diferencia del historial, los buckets acumulan todas las ventas
+ingresadas (no se descuentan al desalojar) y se podan por antigüedad
+según la retención de cada resolución. Los buckets se alinean a epoch
+UTC; cualquier rango alineado al minuto se resuelve igual de exacto.
+"""
+
+from bisect import bisect_left
+from collections import deque
+from typing import NamedTuple
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+class PeriodTotals(NamedTuple):
+    """Totales de un periodo de tiempo."""
+    count: int
+    total: float
+
+
+class TimeBuckets:
+    """Buckets de una resolución fija: inicio del bucket -> [count, centavos]."""
+
+    __slots__ = ("resolution", "retention", "_buckets", "_order", "_pruned_before")
+
+    def __init__(self, resolution, retention):
+        self.resolution = resolution
+        self.retention = retention  # Número máximo de buckets conservados
+        self._buckets = {}
+        self._order = deque()  # Inicios de bucket en orden de creación
+        self._pruned_before = None  # Todo lo anterior a este instante se descartó
+
+    def add(self, timestamp, cents):
+        self.add_bucket(timestamp - timestamp % self.resolution, 1, cents)
+
+    def add_bucket(self, start, count, cents):
+        """Suma `count` ventas por `cents` al bucket que empieza en `start`."""
+        if self._pruned_before is not None and start < self._pruned_before:
+            return  # Ventas tardías fuera de la retención
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = [0, 0]
+            self._order.append(start)
+            self._prune(start)
+        bucket[0] += count
+        bucket[1] += cents
+
+    def _prune(self, newest):
+        oldest_allowed = newest - (self.retention - 1) * self.resolution
+        order = self._order
+        while order and order[0] < oldest_allowed:
+            del self._buckets[order.popleft()]
+            self._pruned_before = oldest_allowed
+
+    def get(self, start):
+        return self._buckets.get(start)
+
+    def covers(self, start):
+        """Indica si el bucket que empieza en `start` no fue podado."""
+        return self._pruned_before is None or start >= self._pruned_before
+
+    def merge(self, other):
+        """Suma los buckets de otra instancia de la misma resolución."""
+        buckets = other._buckets
+        for start in other._order:
+            count, cents = buckets[start]
+            self.add_bucket(start, count, cents)
+
+    def clear(self):
+        self._buckets.clear()
+        self._order.clear()
+        self._pruned_before = None
+
+
+class TimeRollup:
+    """
+    Índice multirresolución para consultar ingresos por rango de tiempo.
+
+    Una consulta recorre el rango con los buckets más grandes que encajen
+    (días, luego horas, luego minutos), así que el coste es O(buckets)
+    y no depende del número de ventas.
+    """
+
+    def __init__(self, minute_retention=2 * 24 * 60, hour_retention=90 * 24, day_retention=3650):
+        self.levels = (
+            TimeBuckets(DAY, day_retention),
+            TimeBuckets(HOUR, hour_retention),
+            TimeBuckets(MINUTE, minute_retention),
+        )
+
+    def add(self, timestamp, cents):
+        """Registra una venta en todas las resoluciones."""
+        for level in self.levels:
+            level.add(timestamp, cents)
+
+    def add_many(self, timestamps, cents, presorted=False):
+        """
+        Registra un lote de ventas (columnas paralelas).
+
+        Con timestamps ordenados cada bucket se resuelve con una búsqueda
+        binaria y una suma de su tramo, sin recorrer las ventas una a una.
+        """
+        if not presorted:
+            for timestamp, amount in zip(timestamps, cents):
+                self.add(timestamp, amount)
+            return
+        count = len(timestamps)
+        for level in self.levels:
+            resolution = level.resolution
+            index = 0
+            while index < count:
+                start = timestamps[index] - timestamps[index] % resolution
+                end = bisect_left(timestamps, start + resolution, index)
+                level.add_bucket(start, end - index, sum(cents[index:end]))
+                index = end
+
+    def merge(self, other):
+        """Suma las ventas de otro índice (p. ej. uno construido en paralelo)."""
+        for level, source in zip(self.levels, other.levels):
+            level.merge(source)
+
+    def clear(self):
+        for level in self.levels:
+            level.clear()
+
+    def range_totals(self, start, end):
+        """
+        Totales de las ventas con timestamp en [start, end).
+
+        Los extremos se redondean al minuto (los buckets de minuto que los
+        contienen cuentan completos).
+        """
+        cursor = start - start % MINUTE
+        end = end - end % MINUTE + (MINUTE if end % MINUTE else 0)
+        count = 0
+        cents = 0
+        while cursor < end:
+            for level in self.levels:
+                resolution = level.resolution
+                if cursor % resolution == 0 and cursor + resolution <= end and level.covers(cursor):
+                    break
+            else:
+                # Ninguna resolución conserva este minuto: no hay datos
+                cursor += MINUTE
+                continue
+            bucket = level.get(cursor)
+            if bucket is not None:
+                count += bucket[0]
+                cents += bucket[1]
+            cursor += resolution
+        return PeriodTotals(count, cents / 100)
@@ -0,0 +1,96 @@
+"""
+Representación compacta de una venta.
+Precio en centavos enteros, producto internado como id numérico y hora
+como segundos epoch; los campos legibles se derivan bajo demanda.
+"""
+
+import sys
+import time
+
+_product_names = []
+_product_ids = {}
+
+# Rangos que caben en el almacenamiento (columnas int64 del historial, el
+# journal, los anillos y las sesiones); el timestamp además debe poder
+# mostrarse con time.localtime (hasta el año 9999)
+MAX_CENTS = 2**63 - 1
+MAX_TIMESTAMP = 253402300799
+
+def product_id(name):
+    """Devuelve el id interno de un producto, registrándolo si es nuevo."""
+    pid = _product_ids.get(name)
+    if pid is None:
+        pid = len(_product_names)
+        name = sys.intern(name)
+        _product_names.append(name)
+        _product_ids[name] = pid
+    return pid
+
+def product_name(pid):
+    """Devuelve el nombre de un producto a partir de su id."""
+    return _product_names[pid]
+
+def product_names():
+    """Devuelve los nombres registrados, indexados por id."""
+    return tuple(_product_names)
+
+def to_cents(price):
+    """Convierte un precio decimal a centavos enteros."""
+    return round(price * 100)
+
+
+class Sale:
+    """Venta individual con almacenamiento mínimo (sin __dict__)."""
+
+    __slots__ = ("id", "product_id", "price_cents", "timestamp")
+
+    def __init__(self, product_id, price_cents, timestamp, id=0):
+        self.id = id
+        self.product_id = product_id
+        self.price_cents = price_cents
+        self.timestamp = timestamp
+
+    @classmethod
+    def create(cls, producto, precio, timestamp=None):
+        """Crea una venta a partir de nombre de producto y precio decimal."""
+        if timestamp is None:
+            timestamp = int(time.time())
+        return cls(product_id(producto), to_cents(precio), timestamp)
+
+    @property
+    def producto(self):
+        """Nombre del producto."""
+        return _product_names[self.product_id]
+
+    @property
+    def precio(self):
+        """Precio en unidades monetarias."""
+        return self.price_cents / 100
+
+    @property
+    def hora(self):
+        """Hora local de la venta en formato HH:MM:SS."""
+        return time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+
+    def to_dict(self):
+        """Representación en diccionario (para exportar o registrar)."""
+        return {
+            "id": self.id,
+            "producto": self.producto,
+            "precio": self.precio,
+            "hora": self.hora,
+            "timestamp": self.timestamp,
+        }
+
+    def __reduce__(self):
+        # El id de producto solo vale en este proceso: al serializar (p. ej.
+        # hacia un pool de procesos) viaja el nombre y se vuelve a internar
+        return (_restore_sale, (self.producto, self.price_cents, self.timestamp, self.id))
+
+    def __repr__(self):
+        return f"Sale(#{self.id} {self.producto} ${self.precio:.2f} @ {self.hora})"
+
+
+def _restore_sale(producto, price_cents, timestamp, id):
+    """Reconstruye una venta serializada con Sale.__reduce__."""
+    return Sale(product_id(producto), price_cents, timestamp, id)
@@ -0,0 +1,219 @@
+"""
+Buffer circular de capacidad fija para el historial de ventas.
+Añadir y desalojar son O(1); la lectura es de la más reciente a la más antigua.
+
+Las ventas se guardan por columnas en arrays tipados (id, producto,
+centavos, timestamp), unas 28 bytes por venta, y se materializan como
+objetos Sale solo al leerlas.
+"""
+
+from array import array
+
+from core.sale import Sale
+
+COLUMNS = ("ids", "product_ids", "prices", "timestamps")
+
+
+class SalesBuffer:
+    """Buffer circular columnar que conserva las últimas N ventas."""
+
+    __slots__ = ("_capacity", "_head", "_size", "ids", "product_ids", "prices", "timestamps")
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError(f"La capacidad debe ser positiva, recibido {capacity}")
+        self._capacity = capacity
+        self._head = 0  # Próxima posición de escritura
+        self._size = 0
+        self._allocate()
+
+    def _allocate(self):
+        """Reserva las columnas completas de una vez."""
+        capacity = self._capacity
+        self.ids = array("q", bytes(8 * capacity))
+        self.product_ids = array("I", bytes(4 * capacity))
+        self.prices = array("q", bytes(8 * capacity))
+        self.timestamps = array("q", bytes(8 * capacity))
+
+    @property
+    def capacity(self):
+        """Número máximo de ventas retenidas."""
+        return self._capacity
+
+    def append(self, sale):
+        """
+        Añade una venta y devuelve la desalojada (o None si había espacio).
+
+        Si algún campo no cabe en su columna lanza OverflowError (o
+        TypeError) sin modificar el buffer.
+        """
+        head = self._head
+        evicted = None
+        if self._size == self._capacity:
+            evicted = self._materialize(head)
+        try:
+            self._write(head, sale)
+        except (OverflowError, TypeError):
+            if evicted is not None:
+                self._write(head, evicted)  # La venta que iba a desalojarse sigue vigente
+            raise
+        if evicted is None:
+            self._size += 1
+        self._head = (head + 1) % self._capacity
+        return evicted
+
+    def _write(self, position, sale):
+        self.ids[position] = sale.id
+        self.product_ids[position] = sale.product_id
+        self.prices[position] = sale.price_cents
+        self.timestamps[position] = sale.timestamp
+
+    def extend(self, ids, product_ids, prices, timestamps):
+        """
+        Añade un lote por columnas (más antigua primero) con copias de tramos.
+
+        El lote no puede superar la capacidad; lo que se desaloja se
+        sobrescribe sin materializarse (ver after() para leerlo antes).
+        """
+        count = len(prices)
+        capacity = self._capacity
+        if count > capacity:
+            raise ValueError(f"Lote de {count} ventas mayor que la capacidad {capacity}")
+        columns = (
+            (self.ids, array("q", ids)),
+            (self.product_ids, array("I", product_ids)),
+            (self.prices, array("q", prices)),
+            (self.timestamps, array("q", timestamps)),
+        )
+        head = self._head
+        first = min(count, capacity - head)
+        for column, values in columns:
+            column[head:head + first] = values[:first]
+            column[:count - first] = values[first:]
+        self._head = (head + count) % capacity
+        self._size = min(capacity, self._size + count)
+
+    def clear(self):
+        """Vacía el buffer; las columnas se reutilizan."""
+        self._head = 0
+        self._size = 0
+
+    def column(self, name):
+        """
+        Devuelve un memoryview de una columna con las ventas vigentes.
+
+        El orden es físico (no cronológico), suficiente para agregados
+        vectorizados como sum/min/max.
+        """
+        if name not in COLUMNS:
+            raise KeyError(f"Columna desconocida: {name}")
+        # Tras clear() se escribe desde la posición 0, así que las ventas
+        # vigentes ocupan siempre el prefijo [0, size)
+        return memoryview(getattr(self, name))[:self._size]
+
+    def after(self, sale_id, limit):
+        """
+        Devuelve hasta `limit` ventas con id mayor que `sale_id`, de la más
+        antigua a la más reciente.
+
+        Los ids crecen con la antigüedad inversa, así que el punto de inicio
+        se localiza por búsqueda binaria.
+        """
+        size = self._size
+        capacity = self._capacity
+        oldest = (self._head - size) % capacity
+        ids = self.ids
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            if ids[(oldest + middle) % capacity] <= sale_id:
+                low = middle + 1
+            else:
+                high = middle
+        return [
+            self._materialize((oldest + offset) % capacity)
+            for offset in range(low, min(size, low + limit))
+        ]
+
+    def find(self, sale_id):
+        """Devuelve la venta con ese id, o None si ya no está retenida."""
+        found = self.after(sale_id - 1, 1)
+        return found[0] if found and found[0].id == sale_id else None
+
+    def recent(self, limit, after=0):
+        """
+        Devuelve hasta `limit` ventas con id mayor que `after`, de la más
+        reciente a la más antigua (para buscar por producto ver
+        ProductIndex.recent_sale_ids).
+        """
+        capacity = self._capacity
+        ids = self.ids
+        found = []
+        position = self._head
+        for _ in range(min(self._size, limit)):
+            position = (position - 1) % capacity
+            if ids[position] <= after:
+                break
+            found.append(self._materialize(position))
+        return found
+
+    def _materialize(self, position):
+        """Construye un Sale a partir de una posición física."""
+        return Sale(
+            self.product_ids[position],
+            self.prices[position],
+            self.timestamps[position],
+            self.ids[position],
+        )
+
+    def _slot_index(self, index):
+        """Traduce un índice lógico (0 = más reciente) a la posición física."""
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError("Índice de venta fuera de rango")
+        return (self._head - 1 - index) % self._capacity
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        return self._materialize(self._slot_index(index))
+
+    def __iter__(self):
+        capacity = self._capacity
+        position = self._head
+        for _ in range(self._size):
+            position = (position - 1) % capacity
+            yield self._materialize(position)
+
+    def view(self):
+        """Devuelve una vista de solo lectura sin copiar los datos."""
+        return SalesBufferView(self)
+
+
+class SalesBufferView:
+    """Vista de solo lectura sobre un SalesBuffer (más reciente primero)."""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        return self._buffer[index]
+
+    def __iter__(self):
+        return iter(self._buffer)
+
+    def column(self, name):
+        """Acceso de solo lectura a una columna (ver SalesBuffer.column)."""
+        return self._buffer.column(name).toreadonly()
+
+    def __repr__(self):
+        return f"SalesBufferView({len(self._buffer)} ventas)"
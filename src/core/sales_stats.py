@@ -0,0 +1,105 @@
+"""
+Agregados incrementales sobre la ventana de ventas retenida.
+Cada alta y cada desalojo cuestan O(1) amortizado.
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+
+class SalesStats(NamedTuple):
+    """Resumen inmutable de las ventas en el historial."""
+    count: int
+    total: float
+    mean: float
+    min: float
+    max: float
+
+
+EMPTY_STATS = SalesStats(count=0, total=0.0, mean=0.0, min=0.0, max=0.0)
+
+
+class RunningAggregates:
+    """
+    Mantiene count, suma, media, mínimo y máximo de una ventana FIFO.
+
+    Los importes se acumulan en centavos enteros para que sumar y restar
+    no arrastre error de coma flotante. Mínimo y máximo usan colas
+    monótonas: como el desalojo siempre es de la venta más antigua,
+    basta con descartar el frente cuando coincide con ella.
+    """
+
+    __slots__ = ("count", "total_cents", "_min_queue", "_max_queue")
+
+    def __init__(self):
+        self.count = 0
+        self.total_cents = 0
+        self._min_queue = deque()  # (secuencia, centavos) con centavos crecientes
+        self._max_queue = deque()  # (secuencia, centavos) con centavos decrecientes
+
+    def add(self, sequence, cents):
+        """Registra una venta nueva identificada por su número de secuencia."""
+        self.count += 1
+        self.total_cents += cents
+
+        min_queue = self._min_queue
+        while min_queue and min_queue[-1][1] >= cents:
+            min_queue.pop()
+        min_queue.append((sequence, cents))
+
+        max_queue = self._max_queue
+        while max_queue and max_queue[-1][1] <= cents:
+            max_queue.pop()
+        max_queue.append((sequence, cents))
+
+    def add_many(self, first_sequence, cents):
+        """Registra ventas con secuencias consecutivas desde `first_sequence`."""
+        if not cents:
+            return
+        self.count += len(cents)
+        self.total_cents += sum(cents)
+        self._extend_queue(self._min_queue, first_sequence, cents, lambda a, b: a < b)
+        self._extend_queue(self._max_queue, first_sequence, cents, lambda a, b: a > b)
+
+    @staticmethod
+    def _extend_queue(queue, first_sequence, cents, better):
+        # Del lote solo sobreviven los valores estrictamente mejores que
+        # todos los posteriores; se localizan recorriéndolo desde el final
+        survivors = []
+        best = None
+        for offset in range(len(cents) - 1, -1, -1):
+            value = cents[offset]
+            if best is None or better(value, best):
+                best = value
+                survivors.append((first_sequence + offset, value))
+        while queue and not better(queue[-1][1], best):
+            queue.pop()
+        queue.extend(reversed(survivors))
+
+    def remove_oldest(self, sequence, cents):
+        """Descuenta la venta más antigua de la ventana."""
+        self.count -= 1
+        self.total_cents -= cents
+        if self._min_queue and self._min_queue[0][0] == sequence:
+            self._min_queue.popleft()
+        if self._max_queue and self._max_queue[0][0] == sequence:
+            self._max_queue.popleft()
+
+    def reset(self):
+        """Vuelve al estado vacío."""
+        self.count = 0
+        self.total_cents = 0
+        self._min_queue.clear()
+        self._max_queue.clear()
+
+    def snapshot(self):
+        """Devuelve los agregados actuales como SalesStats."""
+        if self.count == 0:
+            return EMPTY_STATS
+        return SalesStats(
+            count=self.count,
+            total=self.total_cents / 100,
+            mean=self.total_cents / self.count / 100,
+            min=self._min_queue[0][1] / 100,
+            max=self._max_queue[0][1] / 100,
+        )
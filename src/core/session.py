@@ -0,0 +1,165 @@
+"""
+Grabación y reproducción de sesiones de ventas.
+
+SessionRecorder escucha los eventos de ventas del dispatcher y guarda
+cada venta junto con el tiempo transcurrido desde el evento anterior, en
+un archivo binario compacto (25 bytes por venta):
+
+    MAGIC
+    producto: tipo 0 (uint8) | id de la sesión (uint32) | largo (uint16) | nombre UTF-8
+    venta:    tipo (uint8) | espera en µs (uint32) | timestamp (int64)
+              | centavos (int64) | id de producto de la sesión (uint32)
+
+Los campos tienen el mismo rango que el historial: una venta que no cabe
+detiene la grabación con un error en lugar de faltar en silencio.
+
+El tipo de una venta indica el evento con el que llegó: 1 = SALE_ADDED,
+2 = primera venta de un SALES_ADDED_BATCH, 3 = resto del mismo lote (con
+espera 0). Así la reproducción (sources.ReplaySource) repite los mismos
+eventos, con los mismos lotes y el mismo ritmo.
+"""
+
+import atexit
+import mmap
+import os
+import struct
+import time
+from typing import NamedTuple
+
+from core.sale import Sale, product_id, product_name
+from events import dispatcher
+from infrastructure.logger import logger
+
+MAGIC = b"EXPS\x02\x00\x00\x00"
+PRODUCT = struct.Struct("<BIH")
+SALE = struct.Struct("<BIqqI")
+
+KIND_PRODUCT = 0
+KIND_SINGLE = 1
+KIND_BATCH = 2
+KIND_BATCH_MORE = 3
+MAX_DELAY_US = 2**32 - 1  # ~71 minutos; pausas mayores se recortan
+
+
+class ReplayReport(NamedTuple):
+    """Resultado de reproducir una sesión (latencias como LatencyHistogram.summary())."""
+    events: int
+    sales: int
+    elapsed: float    # Segundos reales de la reproducción
+    recorded: float   # Segundos que duró la sesión original
+    speed: float      # 0 = tan rápido como sea posible
+    latency: dict     # Desde la hora programada hasta terminar el dispatch
+    processing: dict  # Solo almacén + dispatch
+
+
+class SessionRecorder:
+    """Graba los eventos de ventas del dispatcher en un archivo de sesión."""
+
+    def __init__(self, path):
+        self.path = path
+        self.recorded = 0
+        self._file = None
+        self._session_ids = {}  # product_id local -> id de la sesión
+        self._last_event_ns = None
+
+    def start(self):
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self._last_event_ns = time.perf_counter_ns()
+        dispatcher.subscribe("SALE_ADDED", self._on_sale)
+        dispatcher.subscribe("SALES_ADDED_BATCH", self._on_batch)
+        atexit.register(self.stop)
+        logger.info(f"⏺️ Grabando sesión de ventas en {self.path}")
+
+    def stop(self):
+        """Deja de grabar y cierra el archivo."""
+        if self._file is None:
+            return
+        dispatcher.unsubscribe("SALE_ADDED", self._on_sale)
+        dispatcher.unsubscribe("SALES_ADDED_BATCH", self._on_batch)
+        self._file.close()
+        self._file = None
+        logger.info(f"⏹️ Sesión grabada: {self.recorded} ventas en {self.path}")
+
+    def _delay_us(self):
+        now = time.perf_counter_ns()
+        delay = (now - self._last_event_ns) // 1000
+        self._last_event_ns = now
+        return min(delay, MAX_DELAY_US)
+
+    def _session_id(self, pid):
+        sid = self._session_ids.get(pid)
+        if sid is None:
+            sid = self._session_ids[pid] = len(self._session_ids)
+            name = product_name(pid).encode("utf-8")
+            self._file.write(PRODUCT.pack(KIND_PRODUCT, sid, len(name)) + name)
+        return sid
+
+    def _write(self, kind, delay_us, sale):
+        try:
+            sid = self._session_id(sale.product_id)
+            record = SALE.pack(kind, delay_us, sale.timestamp, sale.price_cents, sid)
+        except struct.error as e:
+            # Saltarse la venta haría que la reproducción ya no coincida con lo vivido
+            logger.error(f"💥 {sale!r} no cabe en la sesión ({e}); grabación detenida en {self.path}")
+            self.stop()
+            raise
+        self._file.write(record)
+        self.recorded += 1
+
+    def _on_sale(self, sale):
+        self._write(KIND_SINGLE, self._delay_us(), sale)
+
+    def _on_batch(self, sales):
+        if not sales:
+            return
+        self._write(KIND_BATCH, self._delay_us(), sales[0])
+        for sale in sales[1:]:
+            self._write(KIND_BATCH_MORE, 0, sale)
+
+
+def iter_events(path):
+    """
+    Recorre una sesión grabada evento por evento.
+
+    Devuelve tuplas (espera en segundos desde el evento anterior, nombre
+    del evento, lista de Sale sin id). El archivo se recorre con mmap, así
+    que la memoria no depende de la duración de la sesión.
+    """
+    with open(path, "rb") as source:
+        if os.fstat(source.fileno()).st_size < len(MAGIC):
+            raise ValueError(f"Archivo de sesión inválido: {path}")
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Archivo de sesión inválido o de otra versión: {path}")
+            yield from _iter_mapped(data, path)
+
+
+def _iter_mapped(data, path):
+    """Decodifica los eventos tras la cabecera de una sesión ya validada."""
+    local_ids = {}
+    offset = len(MAGIC)
+    event = None
+    while offset < len(data):
+        kind = data[offset]
+        if kind == KIND_PRODUCT:
+            _, sid, length = PRODUCT.unpack_from(data, offset)
+            offset += PRODUCT.size
+            local_ids[sid] = product_id(data[offset:offset + length].decode("utf-8"))
+            offset += length
+            continue
+        if offset + SALE.size > len(data):
+            logger.warning(f"⚠️ Sesión con registro incompleto al final: {path}")
+            break
+        kind, delay_us, timestamp, cents, sid = SALE.unpack_from(data, offset)
+        offset += SALE.size
+        sale = Sale(local_ids[sid], cents, timestamp)
+        if kind == KIND_BATCH_MORE and event is not None:
+            event[2].append(sale)
+            continue
+        if event is not None:
+            yield event
+        name = "SALE_ADDED" if kind == KIND_SINGLE else "SALES_ADDED_BATCH"
+        event = (delay_us / 1_000_000, name, [sale])
+    if event is not None:
+        yield event
@@ -0,0 +1,323 @@
+"""
+Ingesta con procesos trabajadores y anillos en memoria compartida.
+
+Parsear y validar JSON compite por el GIL con el render de la UI. En este
+modo N procesos trabajadores escuchan el mismo puerto TCP (SO_REUSEPORT:
+el kernel reparte las conexiones), parsean las ventas y las escriben como
+registros de tamaño fijo en un anillo propio en memoria compartida
+(multiprocessing.shared_memory). El proceso principal drena los anillos
+por lotes hacia data_store.add_sales_columns() sin parsear nada.
+
+Cada anillo tiene un único productor y un único consumidor (SPSC):
+
+    cabecera: head (uint64) | tail (uint64) | productos definidos (uint64),
+              cada uno en su propia línea de caché
+    catálogo: MAX_PRODUCTS ranuras de 64 bytes (largo uint8 + nombre UTF-8);
+              los trabajadores rechazan, como líneas inválidas, las ventas
+              de productos que no caben (nombre de más de 63 bytes o más
+              de MAX_PRODUCTS productos distintos)
+    columnas: producto del trabajador (uint32 * capacidad)
+              | centavos (int64 * capacidad) | timestamp (int64 * capacidad)
+
+El productor escribe los registros y después avanza head; el consumidor
+los copia y después avanza tail, así que ninguno toca lo que el otro está
+escribiendo. Los productos nuevos se definen en el catálogo antes de
+publicar las ventas que los usan. Cada lectura o avance de head/tail se
+hace con el lock del anillo (multiprocessing.Lock) tomado: tomarlo y
+soltarlo es una barrera de memoria completa, así que quien ve el nuevo
+head también ve los registros y el catálogo escritos antes, incluso en
+arquitecturas con orden de memoria débil (arm64). El lock se toma una vez
+por lote, no por venta.
+"""
+
+import asyncio
+import multiprocessing
+import operator
+import time
+from array import array
+from itertools import islice
+from multiprocessing import shared_memory
+
+from core import sources, updater
+from core.sale import product_id, product_name
+from infrastructure.logger import logger
+
+CACHE_LINE = 64
+HEAD, TAIL, DEFINED = 0, CACHE_LINE // 8, 2 * CACHE_LINE // 8
+HEADER_SIZE = 3 * CACHE_LINE
+MAX_PRODUCTS = 1024
+NAME_SLOT = 64
+MAX_NAME_BYTES = NAME_SLOT - 1
+CATALOG_SIZE = MAX_PRODUCTS * NAME_SLOT
+DRAIN_BATCH = 8192
+DRAIN_INTERVAL = 0.005
+# Los trabajadores se lanzan con spawn (igual en Linux, macOS y Windows);
+# el lock de cada anillo se crea en el mismo contexto para poder pasárselo
+CONTEXT = multiprocessing.get_context("spawn")
+
+
+class SalesRing:
+    """Anillo SPSC de ventas en memoria compartida."""
+
+    def __init__(self, capacity=65536, name=None, lock=None):
+        self.capacity = capacity
+        # Sincroniza el traspaso de head/tail entre procesos (ver docstring del módulo)
+        self.lock = lock if lock is not None else CONTEXT.Lock()
+        products_size = (4 * capacity + 7) // 8 * 8  # Columnas de 64 bits alineadas
+        size = HEADER_SIZE + CATALOG_SIZE + products_size + 16 * capacity
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._owner = name is None
+
+        buf = self._shm.buf
+        self._bytes = buf
+        self._header = buf[:HEADER_SIZE].cast("Q")
+        self._products_offset = HEADER_SIZE + CATALOG_SIZE
+        self._cents_offset = self._products_offset + products_size
+        self._timestamps_offset = self._cents_offset + 8 * capacity
+
+        self._defined = 0    # Productor: productos ya publicados en el catálogo
+        self._local_ids = []  # Consumidor: producto del trabajador -> product_id local
+
+    def __len__(self):
+        with self.lock:
+            return self._header[HEAD] - self._header[TAIL]
+
+    # --- Productor ---
+
+    def define_products(self, count):
+        """
+        Publica en el catálogo los productos locales [definidos, count).
+
+        Los nombres que no caben quedan como ranura vacía: el trabajador
+        rechaza sus ventas antes de escribirlas (ver RingSocketSource).
+        """
+        if count > MAX_PRODUCTS:
+            raise ValueError(f"Más de {MAX_PRODUCTS} productos distintos en un anillo")
+        for pid in range(self._defined, count):
+            name = product_name(pid).encode("utf-8")
+            if len(name) > MAX_NAME_BYTES:
+                name = b""  # Ranura vacía: ninguna venta publicada usa este producto
+            offset = HEADER_SIZE + pid * NAME_SLOT
+            self._bytes[offset] = len(name)
+            self._bytes[offset + 1:offset + 1 + len(name)] = name
+        if count > self._defined:
+            self._defined = count
+            with self.lock:
+                self._header[DEFINED] = count
+
+    def write(self, products, cents, timestamps):
+        """Escribe lo que quepa de un lote (arrays "I", "q", "q"); devuelve cuántas ventas entraron."""
+        header = self._header
+        with self.lock:
+            head = header[HEAD]
+            tail = header[TAIL]
+        count = min(len(cents), self.capacity - (head - tail))
+        if count <= 0:
+            return 0
+        start = head % self.capacity
+        first = min(count, self.capacity - start)
+        for offset, itemsize, values in (
+            (self._products_offset, 4, products),
+            (self._cents_offset, 8, cents),
+            (self._timestamps_offset, 8, timestamps),
+        ):
+            raw = memoryview(values).cast("B")
+            self._bytes[offset + start * itemsize:offset + (start + first) * itemsize] = raw[:first * itemsize]
+            if count > first:
+                self._bytes[offset:offset + (count - first) * itemsize] = raw[first * itemsize:count * itemsize]
+        with self.lock:
+            # Soltar el lock publica los registros y el catálogo antes que head
+            header[HEAD] = head + count
+        return count
+
+    # --- Consumidor ---
+
+    def read(self, limit=DRAIN_BATCH):
+        """Copia hasta `limit` ventas como columnas (product_ids locales, centavos, timestamps)."""
+        header = self._header
+        with self.lock:
+            tail = header[TAIL]
+            count = min(header[HEAD] - tail, limit)
+            defined = header[DEFINED]
+        if count <= 0:
+            return None
+        # head se leyó antes que el catálogo: todo producto usado ya está definido
+        for wid in range(len(self._local_ids), defined):
+            offset = HEADER_SIZE + wid * NAME_SLOT
+            length = self._bytes[offset]
+            if not length:
+                self._local_ids.append(None)
+                continue
+            name = bytes(self._bytes[offset + 1:offset + 1 + length]).decode("utf-8")
+            self._local_ids.append(product_id(name))
+
+        start = tail % self.capacity
+        first = min(count, self.capacity - start)
+        columns = []
+        for typecode, offset, itemsize in (
+            ("I", self._products_offset, 4),
+            ("q", self._cents_offset, 8),
+            ("q", self._timestamps_offset, 8),
+        ):
+            column = array(typecode)
+            column.frombytes(self._bytes[offset + start * itemsize:offset + (start + first) * itemsize])
+            if count > first:
+                column.frombytes(self._bytes[offset:offset + (count - first) * itemsize])
+            columns.append(column)
+        with self.lock:
+            # Los registros ya se copiaron: el productor puede reutilizar sus ranuras
+            header[TAIL] = tail + count
+
+        worker_products, cents, timestamps = columns
+        products = array("I", list(map(self._local_ids.__getitem__, worker_products)))
+        return products, cents, timestamps
+
+    def close(self):
+        """Libera las vistas y, si este proceso lo creó, elimina el segmento."""
+        self._header.release()
+        self._bytes = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _columns(sales):
+    return (
+        array("I", [sale.product_id for sale in sales]),
+        array("q", [sale.price_cents for sale in sales]),
+        array("q", [sale.timestamp for sale in sales]),
+    )
+
+
+async def write_async(ring, sales, poll_interval=0.001):
+    """Escribe un lote en el anillo esperando (backpressure) mientras esté lleno."""
+    ring.define_products(max(sale.product_id for sale in sales) + 1)
+    products, cents, timestamps = _columns(sales)
+    written = 0
+    while written < len(cents):
+        count = ring.write(products[written:], cents[written:], timestamps[written:])
+        written += count
+        if written < len(cents):
+            await asyncio.sleep(poll_interval)
+
+
+def write_blocking(ring, sales, poll_interval=0.001):
+    """Igual que write_async, para productores sin loop."""
+    ring.define_products(max(sale.product_id for sale in sales) + 1)
+    products, cents, timestamps = _columns(sales)
+    written = 0
+    while written < len(cents):
+        written += ring.write(products[written:], cents[written:], timestamps[written:])
+        if written < len(cents):
+            time.sleep(poll_interval)
+
+
+class RingSocketSource(sources.SocketSource):
+    """Listener TCP de un trabajador: publica en su anillo en lugar del almacén."""
+
+    def __init__(self, ring, host, port, batch_size=1000):
+        super().__init__(host, port, batch_size=batch_size, reuse_port=True)
+        self.ring = ring
+        self.name = "tcp-worker"
+        self._fits = {}  # product_id -> si cabe en el catálogo del anillo
+
+    def _fits_catalog(self, pid):
+        fits = self._fits.get(pid)
+        if fits is None:
+            name = product_name(pid)
+            fits = self._fits[pid] = pid < MAX_PRODUCTS and len(name.encode("utf-8")) <= MAX_NAME_BYTES
+            if not fits:
+                logger.warning(
+                    f"⚠️ Producto rechazado: no cabe en el catálogo del anillo "
+                    f"(máximo {MAX_NAME_BYTES} bytes y {MAX_PRODUCTS} productos): {name[:40]!r}"
+                )
+        return fits
+
+    async def _publish(self, batch):
+        accepted = [sale for sale in batch if self._fits_catalog(sale.product_id)]
+        self.rejected += len(batch) - len(accepted)
+        if not accepted:
+            return
+        self.received += len(accepted)
+        await write_async(self.ring, accepted)
+
+
+def _worker_main(ring_name, ring_lock, capacity, host, port, batch_size):
+    """Punto de entrada de un proceso trabajador."""
+    ring = SalesRing(capacity, name=ring_name, lock=ring_lock)
+    try:
+        asyncio.run(RingSocketSource(ring, host, port, batch_size).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+class ShmIngest:
+    """Lanza los trabajadores y drena sus anillos hacia el almacén."""
+
+    def __init__(self, workers, capacity=65536):
+        self.workers = workers
+        self.capacity = capacity
+        self.rings = []
+        self.processes = []
+        self.drained = 0
+
+    def add_ring(self):
+        """Crea un anillo más (para trabajadores propios, p. ej. en benchmarks)."""
+        ring = SalesRing(self.capacity)
+        self.rings.append(ring)
+        return ring
+
+    def start(self, host, port, batch_size=1000):
+        """Lanza `workers` procesos escuchando en host:port."""
+        for index in range(self.workers):
+            ring = self.add_ring()
+            process = CONTEXT.Process(
+                target=_worker_main,
+                args=(ring.name, ring.lock, self.capacity, host, port, batch_size),
+                name=f"ingest-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"🧵 {self.workers} trabajadores de ingesta escuchando en {host}:{port}")
+
+    def drain_once(self, limit=DRAIN_BATCH):
+        """Mueve al almacén lo disponible en cada anillo; devuelve cuántas ventas movió."""
+        moved = 0
+        for ring in self.rings:
+            columns = ring.read(limit)
+            if columns is None:
+                continue
+            timestamps = columns[2]
+            presorted = all(map(operator.le, timestamps, islice(timestamps, 1, None)))
+            updater.publish_columns(*columns, presorted=presorted)
+            moved += len(timestamps)
+        self.drained += moved
+        return moved
+
+    async def run(self):
+        """Tarea del loop principal: drena mientras haya datos y si no, espera un poco."""
+        try:
+            while True:
+                if self.drain_once() == 0:
+                    await asyncio.sleep(DRAIN_INTERVAL)
+                else:
+                    await asyncio.sleep(0)  # Ceder a la UI entre lotes
+        finally:
+            self.stop()
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout=1)
+        self.processes.clear()
+        for ring in self.rings:
+            ring.close()
+        self.rings.clear()
@@ -0,0 +1,345 @@
+"""
+Orígenes de ventas reales que reemplazan al simulador.
+
+Cada origen entrega bytes por tramos y comparte el mismo procesamiento:
+se parten en líneas de forma incremental (una línea cortada entre tramos
+se completa con el siguiente), cada línea es un objeto JSON con la venta
+y las ventas de un tramo se publican juntas en el almacén.
+
+    {"producto": "🍞 Pan", "precio": 3.5, "timestamp": 1718000000}
+
+`precio` puede sustituirse por `centavos` (entero) y `timestamp` es
+opcional (por defecto, la hora de llegada). Las líneas inválidas (JSON
+mal formado, precio no finito o valores que no caben en el historial) se
+registran y se descartan sin detener el origen.
+
+Backpressure: no se lee el siguiente tramo hasta publicar el anterior
+(esperando a los suscriptores asíncronos con política BLOCK), así que
+un consumidor lento frena la lectura: en los sockets se llena la ventana
+TCP y las terminales esperan en lugar de acumular memoria aquí.
+
+Orígenes disponibles (EXPENDIO_SOURCE): "file" (sigue un archivo al que
+se le añaden líneas), "tcp", "unix" (listener para terminales de venta),
+"stdin" y "replay" (reproduce una sesión grabada, ver core.session).
+"""
+
+import asyncio
+import json
+import math
+from abc import ABC, abstractmethod
+import os
+import sys
+import time
+
+from core import data_store, session, updater
+from core.sale import MAX_CENTS, MAX_TIMESTAMP, Sale, product_id, to_cents
+from events import dispatcher, metrics
+from infrastructure.config import Config
+from infrastructure.logger import logger
+
+SOURCES = ("simulator", "file", "tcp", "unix", "stdin", "replay")
+READ_CHUNK = 64 * 1024
+MAX_LINE_BYTES = 64 * 1024
+
+def parse_sale(line):
+    """Convierte una línea JSON (bytes o str) en un Sale; lanza ValueError si no es válida."""
+    try:
+        record = json.loads(line)
+        producto = record["producto"]
+        if "centavos" in record:
+            cents = int(record["centavos"])
+        else:
+            precio = float(record["precio"])
+            if not math.isfinite(precio):
+                raise ValueError(f"precio no finito: {precio}")
+            cents = to_cents(precio)
+        timestamp = int(record.get("timestamp") or time.time())
+    except (ValueError, KeyError, TypeError, OverflowError) as e:
+        raise ValueError(f"Venta inválida: {e}") from e
+    if not isinstance(producto, str) or not producto:
+        raise ValueError("Venta inválida: producto vacío")
+    if not 0 <= cents <= MAX_CENTS:
+        raise ValueError(f"Venta inválida: precio fuera de rango ({cents} centavos)")
+    if not 0 <= timestamp <= MAX_TIMESTAMP:
+        raise ValueError(f"Venta inválida: timestamp fuera de rango ({timestamp})")
+    return Sale(product_id(producto), cents, timestamp)
+
+
+class IngestionSource(ABC):
+    """Base de los orígenes: partición en líneas, parseo y publicación por lotes."""
+
+    name = "origen"
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.received = 0
+        self.rejected = 0
+
+    @abstractmethod
+    async def run(self):
+        """Lee del origen hasta que se agote o se cancele la tarea."""
+
+    async def consume(self, read_chunk, origin):
+        """
+        Procesa los tramos que devuelve `read_chunk()` hasta que entregue b"".
+
+        `origin` identifica la conexión o archivo en los mensajes de log.
+        """
+        pending = b""
+        while True:
+            chunk = await read_chunk()
+            if not chunk:
+                break
+            pending = await self.feed(pending + chunk, origin)
+        if pending.strip():
+            await self.feed(pending + b"\n", origin)
+
+    async def feed(self, data, origin):
+        """Publica las líneas completas de `data` y devuelve el resto sin terminar."""
+        lines = data.split(b"\n")
+        remainder = lines.pop()
+        if len(remainder) > MAX_LINE_BYTES:
+            logger.warning(f"⚠️ Línea de más de {MAX_LINE_BYTES} bytes descartada ({origin})")
+            self.rejected += 1
+            remainder = b""
+
+        batch = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                batch.append(parse_sale(line))
+            except ValueError as e:
+                self.rejected += 1
+                logger.warning(f"⚠️ {e} ({origin}): {line[:120]!r}")
+                continue
+            except Exception as e:
+                # Un error inesperado descarta solo la línea, no el origen
+                self.rejected += 1
+                logger.error(f"💥 Error inesperado al parsear una venta ({origin}): {e!r} {line[:120]!r}")
+                continue
+            if len(batch) >= self.batch_size:
+                await self._publish(batch)
+                batch = []
+        if batch:
+            await self._publish(batch)
+        return remainder
+
+    async def _publish(self, batch):
+        self.received += len(batch)
+        await updater.publish_sales_async(batch)
+
+    def stats(self):
+        return {"source": self.name, "received": self.received, "rejected": self.rejected}
+
+
+class FileTailSource(IngestionSource):
+    """Sigue un archivo de solo-añadir, como `tail -F`: detecta rotación y truncado."""
+
+    name = "file"
+
+    def __init__(self, path, from_start=False, poll_interval=0.25, batch_size=1000):
+        super().__init__(batch_size)
+        self.path = path
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+
+    async def run(self):
+        logger.info(f"📂 Siguiendo el archivo de ventas {self.path}")
+        # Al arrancar se ignora lo ya escrito (salvo from_start); un archivo
+        # que aparece o se rota después se lee desde el principio
+        source = self._open(seek_end=not self.from_start)
+        pending = b""
+        try:
+            while True:
+                if source is None:
+                    source = self._open(seek_end=False)
+                    if source is None:
+                        await asyncio.sleep(self.poll_interval)
+                        continue
+                # Un archivo local se lee sin bloquear el loop de forma apreciable
+                chunk = source.read(READ_CHUNK)
+                if chunk:
+                    pending = await self.feed(pending + chunk, self.path)
+                    continue
+                if self._replaced(source):
+                    logger.info(f"🔄 Archivo de ventas rotado o truncado: {self.path}")
+                    source.close()
+                    source = self._open(seek_end=False)
+                    pending = b""
+                    continue
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if source is not None:
+                source.close()
+
+    def _open(self, seek_end):
+        try:
+            source = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        if seek_end:
+            source.seek(0, os.SEEK_END)
+        return source
+
+    def _replaced(self, source):
+        """True si el archivo se truncó o si la ruta apunta a otro archivo."""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(source.fileno())
+        return (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev) \
+            or current.st_size < source.tell()
+
+
+class SocketSource(IngestionSource):
+    """Listener TCP o Unix: cada terminal envía ventas como JSON por líneas."""
+
+    def __init__(self, host="127.0.0.1", port=9100, path=None, batch_size=1000, reuse_port=False):
+        super().__init__(batch_size)
+        self.host = host
+        self.port = port
+        self.path = path
+        self.reuse_port = reuse_port  # Varios procesos en el mismo puerto (ver core.shm_ingest)
+        self.name = "unix" if path else "tcp"
+        self.connections = 0
+
+    async def run(self):
+        if self.path:
+            server = await asyncio.start_unix_server(self._handle, path=self.path, limit=READ_CHUNK)
+            address = self.path
+        else:
+            server = await asyncio.start_server(
+                self._handle, self.host, self.port, limit=READ_CHUNK, reuse_port=self.reuse_port or None
+            )
+            address = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        logger.info(f"🔌 Escuchando ventas ({self.name}) en {address}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self.path and os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def _handle(self, reader, writer):
+        peer = writer.get_extra_info("peername") or self.path
+        self.connections += 1
+        logger.info(f"🔗 Terminal conectada: {peer}")
+        try:
+            await self.consume(lambda: reader.read(READ_CHUNK), peer)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.warning(f"⚠️ Conexión con {peer} interrumpida: {e}")
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass  # La terminal ya cerró la conexión
+            logger.info(f"🔌 Terminal desconectada: {peer}")
+
+
+class StdinSource(IngestionSource):
+    """Lee ventas de la entrada estándar (tubería o archivo redirigido)."""
+
+    name = "stdin"
+
+    async def run(self):
+        logger.info("⌨️ Leyendo ventas de la entrada estándar")
+        stream = sys.stdin.buffer
+        # read1 en un hilo sirve igual para tuberías, terminales y archivos
+        await self.consume(lambda: asyncio.to_thread(stream.read1, READ_CHUNK), "stdin")
+        logger.info(f"⌨️ Fin de la entrada estándar: {self.received} ventas, {self.rejected} rechazadas")
+
+
+class ReplaySource(IngestionSource):
+    """
+    Reproduce una sesión grabada a velocidad real (1), acelerada (N) o máxima (0).
+
+    Cada evento pasa por el mismo camino que en vivo (data_store y
+    dispatcher) y se mide su latencia de punta a punta: desde la hora en
+    que debía ocurrir hasta que terminan sus suscriptores.
+    """
+
+    name = "replay"
+
+    def __init__(self, path, speed=1.0):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.report = None
+
+    async def run(self):
+        speed_label = f"x{self.speed:g}" if self.speed > 0 else "máxima"
+        logger.info(f"▶️ Reproduciendo sesión {self.path} a velocidad {speed_label}")
+        clock = time.perf_counter_ns
+        latency = metrics.LatencyHistogram()
+        processing = metrics.LatencyHistogram()
+        events = 0
+        recorded = 0.0
+        started = clock()
+
+        for delay, event, sales in session.iter_events(self.path):
+            recorded += delay
+            if self.speed > 0:
+                due = started + int(recorded / self.speed * 1_000_000_000)
+                wait = (due - clock()) / 1_000_000_000
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            else:
+                due = clock()
+                if events % 100 == 0:
+                    await asyncio.sleep(0)  # Ceder el loop aun a velocidad máxima
+
+            begin = clock()
+            if event == "SALE_ADDED":
+                sale = data_store.add_sale(sales[0])
+                logger.log_sale(sale)
+                await dispatcher.publish("SALE_ADDED", sale)
+            else:
+                await updater.publish_sales_async(sales)
+            end = clock()
+
+            processing.record(end - begin)
+            latency.record(end - due)
+            events += 1
+            self.received += len(sales)
+
+        self.report = session.ReplayReport(
+            events, self.received, (clock() - started) / 1_000_000_000, recorded,
+            self.speed, latency.summary(), processing.summary()
+        )
+        logger.info(
+            f"⏹️ Reproducción terminada: {events} eventos, {self.received} ventas en "
+            f"{self.report.elapsed:.2f}s (sesión de {recorded:.2f}s) | latencia p50 "
+            f"{self.report.latency['p50_us']:.1f}µs p99 {self.report.latency['p99_us']:.1f}µs "
+            f"max {self.report.latency['max_us']:.1f}µs"
+        )
+        return self.report
+
+
+def create_source(kind=None):
+    """Crea el origen configurado en EXPENDIO_SOURCE (None para el simulador)."""
+    kind = (kind or Config.SOURCE).lower()
+    batch_size = Config.SOURCE_BATCH_SIZE
+    if kind == "simulator":
+        return None
+    if kind == "file":
+        if not Config.SOURCE_PATH:
+            raise ValueError("El origen 'file' requiere EXPENDIO_SOURCE_PATH")
+        return FileTailSource(Config.SOURCE_PATH, Config.SOURCE_FROM_START, batch_size=batch_size)
+    if kind == "tcp":
+        return SocketSource(Config.SOURCE_HOST, Config.SOURCE_PORT, batch_size=batch_size)
+    if kind == "unix":
+        if not Config.SOURCE_PATH:
+            raise ValueError("El origen 'unix' requiere EXPENDIO_SOURCE_PATH")
+        return SocketSource(path=Config.SOURCE_PATH, batch_size=batch_size)
+    if kind == "stdin":
+        return StdinSource(batch_size)
+    if kind == "replay":
+        if not Config.SOURCE_PATH:
+            raise ValueError("El origen 'replay' requiere EXPENDIO_SOURCE_PATH")
+        speed = 0.0 if Config.REPLAY_SPEED == "max" else float(Config.REPLAY_SPEED)
+        return ReplaySource(Config.SOURCE_PATH, speed)
+    raise ValueError(f"Origen de ventas desconocido: {kind}. Opciones: {', '.join(SOURCES)}")
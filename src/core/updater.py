@@ -1,28 +1,163 @@
 """
 Generador de ventas simuladas periódicamente.
+
+generate_sales_columns() sintetiza lotes grandes de una vez, por columnas;
+usa NumPy si está instalado y si no un muestreo equivalente en Python puro
+(las dos vías son reproducibles con semilla, pero no coinciden entre sí).
 """
 
 import asyncio
 import random
-from datetime import datetime
-from core import data_store
+import time
+from array import array
+from itertools import repeat
+from core import data_store, load_generator
+from core.sale import Sale, product_id
 from infrastructure.config import Config
 from infrastructure.logger import logger
 from events import dispatcher
 
+try:
+    import numpy as np
+except ImportError:  # Opcional: solo acelera generate_sales_columns
+    np = None
+
 PRODUCTS = ["🍎 Manzana", "🍞 Pan", "🧃 Jugo", "🥛 Leche", "🥣 Cereal", "🍌 Banana", "🧀 Queso"]
+PRODUCT_IDS = [product_id(name) for name in PRODUCTS]
+PRICE_MIN_CENTS = 150
+PRICE_MAX_CENTS = 1599
+
+def publish_sales(sales):
+    """Ingresa un lote de ventas y emite un único evento SALES_ADDED_BATCH."""
+    added = data_store.add_sales(sales)
+    if added:
+        logger.log_sale_batch(added)
+        dispatcher.dispatch("SALES_ADDED_BATCH", added)
+    return added
+
+def _choice_column(rng, typecode, options, count):
+    """
+    Columna de `count` elementos elegidos al azar (uniforme) de `options`.
+
+    En lugar de sortear uno a uno se piden bytes aleatorios de una vez y se
+    convierten a índices con operaciones en C (translate / filter / map);
+    los valores que sesgarían el módulo se descartan (muestreo por rechazo).
+    """
+    options = list(options)
+    bound = len(options)
+    if bound <= 256:
+        limit = 256 - 256 % bound
+        table = bytes(value % bound for value in range(256))
+        rejected = bytes(range(limit, 256))
+        indices = b""
+        while len(indices) < count:
+            missing = count - len(indices)
+            indices += rng.randbytes(missing + missing // 8 + 64).translate(table, rejected)
+        return array(typecode, list(map(options.__getitem__, indices[:count])))
+
+    limit = 65536 - 65536 % bound
+    table = options * (limit // bound)
+    values = []
+    while len(values) < count:
+        missing = count - len(values)
+        words = array("H", rng.randbytes(2 * (missing + missing // 16 + 64))).tolist()
+        values.extend(map(table.__getitem__, filter(limit.__gt__, words)))
+    del values[count:]
+    return array(typecode, values)
+
+def generate_sales_columns(count, seed=None, start=None, span=3600):
+    """
+    Genera `count` ventas aleatorias como columnas (productos, centavos, timestamps).
+
+    Producto y precio se sortean de forma uniforme; los timestamps se
+    reparten a ritmo constante en [start, start + span) (por defecto la
+    última hora) y salen ordenados. Devuelve arrays tipados listos para
+    data_store.add_sales_columns(..., presorted=True).
+    """
+    if start is None:
+        start = int(time.time()) - span
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        choices = np.asarray(PRODUCT_IDS, dtype=np.uint32)
+        products = choices[rng.integers(0, len(choices), count)]
+        prices = rng.integers(PRICE_MIN_CENTS, PRICE_MAX_CENTS + 1, count, dtype=np.int64)
+        timestamps = np.arange(count, dtype=np.int64) * span // max(count, 1) + start
+        return (
+            array("I", products.tobytes()),
+            array("q", prices.tobytes()),
+            array("q", timestamps.tobytes()),
+        )
+
+    rng = random.Random(seed)
+    products = _choice_column(rng, "I", PRODUCT_IDS, count)
+    prices = _choice_column(rng, "q", range(PRICE_MIN_CENTS, PRICE_MAX_CENTS + 1), count)
+    # La venta i cae en el segundo i * span // count: se escribe cada
+    # segundo de una vez con la cantidad de ventas que le tocan
+    timestamps = array("q")
+    for offset in range(span):
+        first = -(-offset * count // span)
+        end = -(-(offset + 1) * count // span)
+        if end > first:
+            timestamps.extend(repeat(start + offset, end - first))
+    return products, prices, timestamps
+
+def publish_generated(count, seed=None, start=None, span=3600):
+    """Genera y carga `count` ventas por la vía columnar del almacén (ver publish_columns)."""
+    products, prices, timestamps = generate_sales_columns(count, seed, start, span)
+    publish_columns(products, prices, timestamps, presorted=True, retained_only=True)
+    logger.info(f"🧪 Generadas {count:,} ventas sintéticas ({'numpy' if np is not None else 'python'})")
+    return count
+
+def publish_columns(products, prices, timestamps, presorted=False, retained_only=False):
+    """
+    Ingresa un lote por columnas y emite un único SALES_ADDED_BATCH con el lote completo.
+
+    Con retained_only el evento lleva solo las ventas que quedaron en el
+    historial: sirve para datos sintéticos de millones de ventas, pero
+    los suscriptores que persisten o auditan (p. ej. SessionRecorder)
+    no verían el resto, así que no debe usarse con ventas reales.
+    """
+    count = len(prices)
+    if not count:
+        return 0
+    first_id = data_store.add_sales_columns(products, prices, timestamps, presorted)
+    if retained_only:
+        batch = data_store.get_sales()[:count]
+        batch.reverse()
+    else:
+        batch = list(map(Sale, products, prices, timestamps, range(first_id, first_id + count)))
+    dispatcher.dispatch("SALES_ADDED_BATCH", batch)
+    return count
+
+async def publish_sales_async(sales):
+    """Como publish_sales, pero esperando a los suscriptores con backpressure (BLOCK)."""
+    added = data_store.add_sales(sales)
+    if added:
+        logger.log_sale_batch(added)
+        await dispatcher.publish("SALES_ADDED_BATCH", added)
+    return added
 
 async def start_simulation():
     """Inicia la simulación de ventas cada N segundos según configuración."""
+    if Config.SIMULATION_MODE == "load":
+        await load_generator.run(
+            Config.LOAD_SCHEDULE,
+            profile=Config.LOAD_PROFILE,
+            seed=Config.LOAD_SEED,
+            report_interval=Config.LOAD_REPORT_INTERVAL,
+            burst_size=Config.LOAD_BURST_SIZE
+        )
+        return
+
     logger.info(f"🚀 Iniciando simulación con intervalo de {Config.SIMULATION_INTERVAL} segundos")
     
     while True:
         # Genera una venta aleatoria
-        sale = {
-            "producto": random.choice(PRODUCTS),
-            "precio": round(random.uniform(1.50, 15.99), 2),
-            "hora": datetime.now().strftime("%H:%M:%S")
-        }
+        sale = Sale(
+            product_id=random.choice(PRODUCT_IDS),
+            price_cents=random.randint(PRICE_MIN_CENTS, PRICE_MAX_CENTS),
+            timestamp=int(time.time())
+        )
         
         # Añade la venta al almacén
         data_store.add_sale(sale)
@@ -30,8 +165,8 @@ async def start_simulation():
         # Log de la venta
         logger.log_sale(sale)
         
-        # Emite el evento
-        dispatcher.dispatch("SALE_ADDED", sale)
+        # Emite el evento (espera si algún suscriptor aplica backpressure)
+        await dispatcher.publish("SALE_ADDED", sale)
         
         # Espera según configuración
         await asyncio.sleep(Config.SIMULATION_INTERVAL)
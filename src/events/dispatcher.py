@@ -1,31 +1,478 @@
 """
 Manejador de eventos simple (pub/sub).
+
+Cada evento tiene una tupla inmutable de suscriptores que suscribir y
+desuscribir reemplazan (copy-on-write): dispatch hace una sola búsqueda
+y recorre una tupla estable aunque otro hilo esté suscribiendo. Con
+weak=True la suscripción no mantiene vivo al callback y se retira sola
+cuando este desaparece.
+
+Además de los suscriptores síncronos (llamados en línea por dispatch),
+subscribe_async() registra suscriptores con una cola acotada y una tarea
+propia que la drena: un callback lento acumula (o descarta, según su
+política) eventos en su cola sin frenar a quien publica.
+
+Con las métricas activas (ver events.metrics) se registra la latencia
+de cada dispatch y de cada suscriptor.
+
+Los eventos son tópicos jerárquicos (`sales.added.terminal3`) y se puede
+suscribir con comodines (`sales.*`, `sales.#`, ver events.topics). Los
+patrones viven en un trie y la lista de suscriptores de cada tópico
+concreto se resuelve una vez y se guarda en caché hasta el siguiente
+cambio de suscripciones, así que dispatch sigue siendo una búsqueda.
+
+Los suscriptores pesados pueden declarar una política de ejecución
+(ExecutionPolicy): en lugar de correr en línea se lanzan como tarea de
+asyncio o en un pool de hilos o de procesos. Su resultado (si no es None)
+vuelve al loop como evento SUBSCRIBER_RESULT y sus errores como
+SUBSCRIBER_ERROR, ambos con un SubscriberOutcome.
 """
 
+import asyncio
+import inspect
+import multiprocessing
+import threading
+import time
+import types
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, NamedTuple
+from events import metrics
+from events.topics import TopicTrie, is_pattern
+from infrastructure.config import Config
 from infrastructure.logger import logger
 
-subscribers = {}
+SUBSCRIBER_RESULT = "SUBSCRIBER_RESULT"
+SUBSCRIBER_ERROR = "SUBSCRIBER_ERROR"
+
+MATCH_CACHE_SIZE = 4096
+
+subscribers = {}     # patrón -> tupla de suscriptores
+_patterns = TopicTrie()
+_match_cache = {}    # tópico concreto -> tupla de suscriptores (se reemplaza al cambiar suscripciones)
+# Reentrante: el recolector puede retirar una suscripción débil muerta
+# mientras este mismo hilo ya tiene el lock
+_lock = threading.RLock()
+
+
+class _WeakCallback:
+    """
+    Referencia débil a un callback (función o método ligado).
+
+    Para métodos se guarda una referencia débil al objeto y la función
+    sin ligar, que es bastante más barato de invocar que WeakMethod.
+    """
+
+    __slots__ = ("_ref", "_function", "__weakref__")
+
+    def __init__(self, callback, on_dead):
+        def dead(_):
+            on_dead(self)
+
+        if inspect.ismethod(callback):
+            self._ref = weakref.ref(callback.__self__, dead)
+            self._function = callback.__func__
+        else:
+            self._ref = weakref.ref(callback, dead)
+            self._function = None
+
+    def __call__(self, data):
+        target = self._ref()
+        if target is None:
+            return
+        if self._function is None:
+            target(data)
+        else:
+            self._function(target, data)
+
+    def resolve(self):
+        """Devuelve el callback original, o None si ya fue liberado."""
+        target = self._ref()
+        if target is None or self._function is None:
+            return target
+        return types.MethodType(self._function, target)
+
+    def __eq__(self, other):
+        if isinstance(other, _WeakCallback):
+            return self is other
+        return self.resolve() == other
+
+    __hash__ = object.__hash__
+
+
+class ExecutionPolicy(Enum):
+    """Dónde se ejecuta un suscriptor."""
+    INLINE = "inline"    # Dentro de dispatch (por defecto)
+    TASK = "task"        # Tarea de asyncio en el loop
+    THREAD = "thread"    # Pool de hilos (E/S o código que libera el GIL)
+    PROCESS = "process"  # Pool de procesos (CPU); callback y datos deben ser serializables
+
+
+class SubscriberOutcome(NamedTuple):
+    """Resultado o error de un suscriptor no en línea."""
+    event: str
+    subscriber: str
+    data: Any
+    result: Any
+    error: Any
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def _executor(policy):
+    """Pool compartido para la política dada (se crea al primer uso)."""
+    with _executors_lock:
+        executor = _executors.get(policy)
+        if executor is None:
+            if policy is ExecutionPolicy.THREAD:
+                executor = ThreadPoolExecutor(
+                    max_workers=Config.DISPATCH_THREAD_WORKERS,
+                    thread_name_prefix="dispatch"
+                )
+            else:
+                # fork en un proceso con hilos (journal, pool de hilos) puede
+                # heredar locks tomados; igual que core.shm_ingest, se usa spawn
+                executor = ProcessPoolExecutor(
+                    max_workers=Config.DISPATCH_PROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            _executors[policy] = executor
+        return executor
+
+def shutdown_executors(wait=True):
+    """Cierra los pools de hilos y procesos de los suscriptores."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+class OffloadedSubscriber:
+    """Suscriptor que se ejecuta fuera de dispatch según su ExecutionPolicy."""
+
+    def __init__(self, event, callback, policy):
+        self.event = event
+        self.callback = callback
+        self.policy = policy
+        self._tasks = set()  # El loop solo guarda referencias débiles a sus tareas
+
+    @property
+    def name(self):
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+    @property
+    def metrics_label(self):
+        """Nombre en las métricas para el coste de lanzar (la ejecución se mide aparte)."""
+        return f"{self.name} (lanzar {self.policy.value})"
+
+    def __call__(self, data):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        submitted = time.perf_counter_ns()
+
+        if self.policy is ExecutionPolicy.TASK:
+            if loop is None:
+                raise RuntimeError("La política TASK requiere un loop de asyncio en ejecución")
+            task = loop.create_task(self._run_task(data, submitted))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+
+        # El loop de esta llamada viaja con su future: otra llamada desde
+        # un hilo sin loop no cambia a dónde vuelve este resultado
+        future = _executor(self.policy).submit(self.callback, data)
+        future.add_done_callback(lambda done: self._on_done(done, loop, data, submitted))
+
+    async def _run_task(self, data, submitted):
+        try:
+            result = self.callback(data)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            self._route(data, None, e, submitted)
+        else:
+            self._route(data, result, None, submitted)
+
+    def _on_done(self, future, loop, data, submitted):
+        """Se ejecuta en el hilo del pool: devuelve el resultado al loop de la llamada."""
+        error = future.exception()
+        result = None if error is not None else future.result()
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._route, data, result, error, submitted)
+        else:
+            self._route(data, result, error, submitted)
 
-def subscribe(event, callback):
-    """Suscribe un callback a un evento específico."""
-    if event not in subscribers:
-        subscribers[event] = []
-    subscribers[event].append(callback)
-    logger.debug(f"📡 Nuevo suscriptor para evento '{event}'. Total: {len(subscribers[event])}")
+    def _route(self, data, result, error, submitted):
+        if metrics.enabled:
+            metrics.record_subscriber(self.event, self.callback, time.perf_counter_ns() - submitted)
+        if error is not None:
+            logger.error(f"💥 Error en suscriptor {self.name} ({self.policy.value}) del evento {self.event}: {error}")
+            dispatch(SUBSCRIBER_ERROR, SubscriberOutcome(self.event, self.name, data, None, error))
+        elif result is not None:
+            dispatch(SUBSCRIBER_RESULT, SubscriberOutcome(self.event, self.name, data, result, None))
+
+    def __eq__(self, other):
+        if isinstance(other, OffloadedSubscriber):
+            return self is other
+        return self.callback == other
+
+    __hash__ = object.__hash__
+
+
+class OverflowPolicy(Enum):
+    """Qué hacer cuando la cola de un suscriptor asíncrono está llena."""
+    BLOCK = "block"              # publish() espera a que haya espacio
+    DROP_OLDEST = "drop_oldest"  # Se descarta el evento más antiguo de la cola
+    COALESCE = "coalesce"        # Solo se conserva el evento más reciente
+
+
+class AsyncSubscriber:
+    """
+    Suscriptor con cola acotada y tarea de drenado en el loop de asyncio.
+
+    Debe alimentarse desde el hilo del loop (dispatch/publish); para
+    productores en otros hilos ver core.ingest.
+    """
+
+    def __init__(self, event, callback, maxsize, policy):
+        self.event = event
+        self.callback = callback
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize)
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._task = None
+
+    @property
+    def name(self):
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+    @property
+    def metrics_label(self):
+        """Nombre en las métricas para el coste de encolar (la ejecución se mide aparte)."""
+        return f"{self.name} (encolado)"
+
+    def _ensure_task(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    def __call__(self, data):
+        """Entrega sin bloquear (usado por dispatch)."""
+        self._ensure_task()
+        queue = self.queue
+        if self.policy is OverflowPolicy.COALESCE:
+            while not queue.empty():
+                queue.get_nowait()
+                self.coalesced += 1
+        elif queue.full():
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                queue.get_nowait()
+            else:
+                # BLOCK desde un dispatch síncrono: no se puede esperar,
+                # el evento nuevo se descarta (usar publish() para esperar)
+                self.dropped += 1
+                return
+            self.dropped += 1
+        queue.put_nowait(data)
+
+    async def put(self, data):
+        """Entrega aplicando backpressure si la política es BLOCK."""
+        if self.policy is OverflowPolicy.BLOCK:
+            self._ensure_task()
+            await self.queue.put(data)
+        else:
+            self(data)
+
+    async def _drain(self):
+        while True:
+            data = await self.queue.get()
+            started = time.perf_counter_ns()
+            try:
+                result = self.callback(data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"💥 Error en callback asíncrono del evento {self.event}: {e}")
+            if metrics.enabled:
+                metrics.record_subscriber(self.event, self.callback, time.perf_counter_ns() - started)
+            self.delivered += 1
+
+    def close(self):
+        """Cancela la tarea de drenado; lo pendiente en la cola se descarta."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        """Profundidad de la cola y contadores de entrega."""
+        return {
+            "event": self.event,
+            "subscriber": self.name,
+            "policy": self.policy.value,
+            "depth": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+def subscribe(event, callback, weak=False, policy=ExecutionPolicy.INLINE):
+    """
+    Suscribe un callback a un evento específico.
+
+    Con weak=True solo se guarda una referencia débil: cuando el callback
+    (o el objeto de un método ligado) se libera, la suscripción se elimina.
+    `policy` indica dónde se ejecuta (ver ExecutionPolicy).
+    """
+    policy = ExecutionPolicy(policy)
+    if policy is not ExecutionPolicy.INLINE:
+        if weak:
+            raise ValueError("Las suscripciones débiles solo admiten la política INLINE")
+        callback = OffloadedSubscriber(event, callback, policy)
+    elif weak:
+        callback = _WeakCallback(callback, lambda dead: unsubscribe(event, dead))
+    with _lock:
+        if event not in subscribers:
+            _patterns.add(event)
+        subscribers[event] = subscribers.get(event, ()) + (callback,)
+        total = len(subscribers[event])
+        _invalidate_matches(event)
+    if logger.is_debug_enabled():
+        logger.debug(f"📡 Nuevo suscriptor para evento '{event}'. Total: {total}")
+
+def subscribe_async(event, callback, maxsize=100, policy=OverflowPolicy.COALESCE):
+    """
+    Suscribe un callback (función o corrutina) que se ejecuta desde su propia cola.
+
+    Devuelve el AsyncSubscriber, que sirve para consultar sus estadísticas
+    y para desuscribirlo con unsubscribe(event, subscriber).
+    """
+    subscriber = AsyncSubscriber(event, callback, maxsize, OverflowPolicy(policy))
+    subscribe(event, subscriber)
+    return subscriber
+
+def _invalidate_matches(event):
+    """
+    Descarta de la caché lo que resolvía el patrón `event` (llamar con _lock tomado).
+
+    Un tópico concreto solo coincide consigo mismo, así que basta quitar
+    su entrada; un patrón con comodines puede afectar a cualquier tópico.
+    """
+    global _match_cache
+    if is_pattern(event):
+        _match_cache = {}
+    else:
+        _match_cache.pop(event, None)
+
+def _resolve(event):
+    """Suscriptores de un tópico concreto: los de todos los patrones que coinciden."""
+    with _lock:
+        cache = _match_cache
+        callbacks = cache.get(event)
+        if callbacks is None:
+            callbacks = tuple(
+                callback
+                for pattern in _patterns.match(event)
+                for callback in subscribers[pattern]
+            )
+            if len(cache) >= MATCH_CACHE_SIZE:
+                cache.clear()
+            cache[event] = callbacks
+        return callbacks
+
+def get_subscribers(event):
+    """Tupla de suscriptores que recibirían el tópico `event`."""
+    callbacks = _match_cache.get(event)
+    return _resolve(event) if callbacks is None else callbacks
 
 def dispatch(event, data=None):
     """Emite un evento a todos los suscriptores."""
-    callback_count = len(subscribers.get(event, []))
-    logger.debug(f"📢 Despachando evento '{event}' a {callback_count} suscriptores")
-    
-    for callback in subscribers.get(event, []):
+    callbacks = _match_cache.get(event)
+    if callbacks is None:
+        callbacks = _resolve(event)
+    if logger.is_debug_enabled():
+        logger.debug(f"📢 Despachando evento '{event}' a {len(callbacks)} suscriptores")
+    if metrics.enabled:
+        _dispatch_timed(event, callbacks, data)
+        return
+
+    for callback in callbacks:
+        try:
+            callback(data)
+        except Exception as e:
+            logger.error(f"💥 Error en callback del evento {event}: {e}")
+
+def _dispatch_timed(event, callbacks, data):
+    """dispatch midiendo la latencia total y la de cada suscriptor."""
+    clock = time.perf_counter_ns
+    started = clock()
+    for callback in callbacks:
+        callback_started = clock()
         try:
             callback(data)
         except Exception as e:
             logger.error(f"💥 Error en callback del evento {event}: {e}")
+        metrics.record_subscriber(event, callback, clock() - callback_started)
+    metrics.record_event(event, clock() - started)
+
+async def publish(event, data=None):
+    """
+    Emite un evento esperando a los suscriptores asíncronos con política BLOCK.
+
+    Es el equivalente de dispatch para productores en el loop que aceptan
+    backpressure; el resto de suscriptores se atiende igual que en dispatch.
+    """
+    timed = metrics.enabled
+    clock = time.perf_counter_ns
+    started = clock() if timed else 0
+    for callback in get_subscribers(event):
+        callback_started = clock() if timed else 0
+        try:
+            if isinstance(callback, AsyncSubscriber):
+                await callback.put(data)
+            else:
+                callback(data)
+        except Exception as e:
+            logger.error(f"💥 Error en callback del evento {event}: {e}")
+        if timed:
+            metrics.record_subscriber(event, callback, clock() - callback_started)
+    if timed:
+        metrics.record_event(event, clock() - started)
 
 def unsubscribe(event, callback):
     """Desuscribe un callback de un evento."""
-    if event in subscribers and callback in subscribers[event]:
-        subscribers[event].remove(callback)
+    with _lock:
+        current = subscribers.get(event, ())
+        if callback not in current:
+            return
+        index = current.index(callback)
+        removed = current[index]
+        if len(current) == 1:
+            del subscribers[event]
+            _patterns.remove(event)
+        else:
+            subscribers[event] = current[:index] + current[index + 1:]
+        _invalidate_matches(event)
+    if isinstance(removed, AsyncSubscriber):
+        removed.close()
+    if logger.is_debug_enabled():
         logger.debug(f"🔇 Suscriptor removido del evento '{event}'")
+
+def get_queue_stats():
+    """Estadísticas de las colas de todos los suscriptores asíncronos."""
+    # Otros hilos pueden suscribir mientras tanto: se recorre una copia
+    with _lock:
+        current = list(subscribers.values())
+    return [
+        callback.stats()
+        for callbacks in current
+        for callback in callbacks
+        if isinstance(callback, AsyncSubscriber)
+    ]
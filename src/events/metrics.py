@@ -0,0 +1,164 @@
+"""
+Métricas de latencia del dispatcher por evento y por suscriptor.
+
+Los tiempos se miden con reloj monótono (perf_counter_ns) y se acumulan
+en histogramas de buckets fijos logarítmicos (4 por potencia de dos,
+~25% de resolución), así que registrar una muestra es O(1) y no reserva
+memoria. Los percentiles se calculan al consultar.
+"""
+
+import asyncio
+from array import array
+from infrastructure.logger import logger
+
+SUB_BUCKET_BITS = 2
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 40  # ~18 minutos en ns; lo mayor cae en el último bucket
+BUCKET_COUNT = (MAX_EXPONENT + 1) * SUB_BUCKETS
+
+
+def _bucket_index(ns):
+    """Bucket logarítmico de una duración en ns."""
+    if ns < SUB_BUCKETS:
+        return max(ns, 0)
+    exponent = ns.bit_length() - 1
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    mantissa = (ns >> (exponent - SUB_BUCKET_BITS)) & (SUB_BUCKETS - 1)
+    return exponent * SUB_BUCKETS + mantissa
+
+
+def _bucket_upper_bound(index):
+    """Límite superior (exclusivo) en ns de un bucket."""
+    exponent, mantissa = divmod(index, SUB_BUCKETS)
+    if exponent < SUB_BUCKET_BITS:
+        return index + 1
+    return (SUB_BUCKETS + mantissa + 1) << (exponent - SUB_BUCKET_BITS)
+
+
+class LatencyHistogram:
+    """Histograma de latencias con buckets fijos."""
+
+    __slots__ = ("count", "total_ns", "max_ns", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._buckets = array("Q", bytes(8 * BUCKET_COUNT))
+
+    def record(self, ns):
+        """Registra una duración en nanosegundos."""
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self._buckets[_bucket_index(ns)] += 1
+
+    def percentile(self, fraction):
+        """Latencia (ns) por debajo de la cual queda `fraction` de las muestras."""
+        if self.count == 0:
+            return 0
+        threshold = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self._buckets):
+            cumulative += bucket_count
+            if bucket_count and cumulative >= threshold:
+                return min(_bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Resumen en microsegundos."""
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile(0.50) / 1000,
+            "p95_us": self.percentile(0.95) / 1000,
+            "p99_us": self.percentile(0.99) / 1000,
+            "max_us": self.max_ns / 1000,
+        }
+
+
+enabled = False
+_event_latencies = {}       # evento -> LatencyHistogram (dispatch completo)
+# (evento, nombre del suscriptor) -> LatencyHistogram; por nombre para no
+# retener callbacks ya desuscritos ni suscripciones débiles muertas
+_subscriber_latencies = {}
+
+
+def enable(value=True):
+    """Activa o desactiva la medición (desactivada no tiene coste en dispatch)."""
+    global enabled
+    enabled = value
+
+
+def record_event(event, ns):
+    histogram = _event_latencies.get(event)
+    if histogram is None:
+        histogram = _event_latencies[event] = LatencyHistogram()
+    histogram.record(ns)
+
+
+def record_subscriber(event, callback, ns):
+    key = (event, _callback_name(callback))
+    histogram = _subscriber_latencies.get(key)
+    if histogram is None:
+        histogram = _subscriber_latencies[key] = LatencyHistogram()
+    histogram.record(ns)
+
+
+def _callback_name(callback):
+    label = getattr(callback, "metrics_label", None)
+    if label:
+        return label
+    resolve = getattr(callback, "resolve", None)
+    if resolve is not None:
+        callback = resolve()
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def get_latency_stats():
+    """Llamadas y percentiles de latencia por evento y por suscriptor."""
+    return {
+        "events": {
+            event: histogram.summary()
+            for event, histogram in _event_latencies.items()
+        },
+        "subscribers": {
+            f"{event}:{name}": histogram.summary()
+            for (event, name), histogram in _subscriber_latencies.items()
+        },
+    }
+
+
+def reset():
+    """Descarta las muestras acumuladas."""
+    _event_latencies.clear()
+    _subscriber_latencies.clear()
+
+
+def log_summary():
+    """Escribe en el log un resumen de latencias, del suscriptor más lento al más rápido."""
+    stats = get_latency_stats()
+    if not stats["events"]:
+        return
+    for event, summary in stats["events"].items():
+        logger.info(
+            f"⏱️ Evento {event}: {summary['count']} despachos | "
+            f"p50 {summary['p50_us']:.1f}µs p95 {summary['p95_us']:.1f}µs "
+            f"p99 {summary['p99_us']:.1f}µs max {summary['max_us']:.1f}µs"
+        )
+    ranked = sorted(stats["subscribers"].items(), key=lambda item: item[1]["p99_us"], reverse=True)
+    for name, summary in ranked:
+        logger.info(
+            f"⏱️   {name}: {summary['count']} llamadas | "
+            f"p50 {summary['p50_us']:.1f}µs p95 {summary['p95_us']:.1f}µs "
+            f"p99 {summary['p99_us']:.1f}µs max {summary['max_us']:.1f}µs"
+        )
+
+
+async def log_summary_periodically(interval):
+    """Tarea que registra el resumen de latencias cada `interval` segundos."""
+    while True:
+        await asyncio.sleep(interval)
+        log_summary()
@@ -0,0 +1,99 @@
+"""
+Tópicos jerárquicos con comodines.
+
+Un tópico es una ruta separada por puntos (`sales.added.terminal3`); un
+nombre plano como `SALE_ADDED` es un tópico de un solo nivel. Los
+patrones de suscripción admiten dos comodines por nivel:
+
+    *  exactamente un nivel       sales.*  -> sales.added
+    #  cero o más niveles         sales.#  -> sales, sales.added.terminal3
+
+Los patrones se guardan en un trie por niveles, así que resolver un
+tópico recorre solo las ramas que pueden coincidir (O(profundidad) sin
+`#`), sin revisar todos los patrones.
+"""
+
+SEPARATOR = "."
+SINGLE = "*"
+MULTI = "#"
+
+
+def split_topic(topic):
+    return topic.split(SEPARATOR)
+
+
+def is_pattern(topic):
+    """Indica si el tópico contiene comodines."""
+    return any(level in (SINGLE, MULTI) for level in split_topic(topic))
+
+
+class _TopicNode:
+    __slots__ = ("children", "pattern")
+
+    def __init__(self):
+        self.children = {}
+        self.pattern = None  # patrón que termina en este nodo
+
+
+class TopicTrie:
+    """Índice de patrones de suscripción por niveles."""
+
+    def __init__(self):
+        self._root = _TopicNode()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, pattern):
+        node = self._root
+        for level in split_topic(pattern):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        if node.pattern is None:
+            node.pattern = pattern
+            self._size += 1
+
+    def remove(self, pattern):
+        """Quita el patrón y poda las ramas que quedan vacías."""
+        path = [self._root]
+        levels = split_topic(pattern)
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].pattern is None:
+            return
+        path[-1].pattern = None
+        self._size -= 1
+        for depth in range(len(levels), 0, -1):
+            node = path[depth]
+            if node.pattern is not None or node.children:
+                break
+            del path[depth - 1].children[levels[depth - 1]]
+
+    def match(self, topic):
+        """Patrones que coinciden con `topic`, sin repetidos, en orden de recorrido."""
+        matches = {}
+        self._collect(self._root, split_topic(topic), 0, matches)
+        return list(matches)
+
+    def _collect(self, node, levels, index, matches):
+        if index == len(levels):
+            if node.pattern is not None:
+                matches[node.pattern] = None
+        else:
+            child = node.children.get(levels[index])
+            if child is not None:
+                self._collect(child, levels, index + 1, matches)
+            child = node.children.get(SINGLE)
+            if child is not None:
+                self._collect(child, levels, index + 1, matches)
+        multi = node.children.get(MULTI)
+        if multi is not None:
+            # '#' consume de cero a todos los niveles restantes
+            for next_index in range(index, len(levels) + 1):
+                self._collect(multi, levels, next_index, matches)
@@ -1,50 +1,125 @@
 """
 Enlaza el data_store con la interfaz de usuario mediante eventos.
+
+Con EXPENDIO_UI_FPS > 0 los eventos no redibujan al instante: se agrupan
+por frame (ver gui.frame_scheduler) y cada vista se actualiza como mucho
+una vez por frame con el estado más reciente del almacén.
+
+Las vistas con update_sales_delta reciben solo los cambios desde la
+versión que ya muestran (data_store.get_sales_since).
+
+Las vistas ocultas (ver set_view_visible) no se redibujan: quedan marcadas
+como pendientes y se ponen al día con un único render al volver a mostrarse.
 """
 
+import time
+from datetime import datetime
 from events import dispatcher
 from core import data_store
+from infrastructure.config import Config
 from core.logger import logger
+from gui.frame_scheduler import FrameScheduler
 
 bindings = []
+_frame_scheduler = FrameScheduler(Config.UI_FPS) if Config.UI_FPS > 0 else None
 
 def bind_sales_to_view(view):
     """Vincula las ventas del data store con la vista."""
     
-    def on_new_sale(sale_data):
-        """Callback que se ejecuta cuando hay una nueva venta."""
+    def refresh_view():
+        """Redibuja la vista con el estado actual del data store."""
         # Verificar que la vista esté en la página antes de actualizar
         if not hasattr(view, 'page') or view.page is None:
             return
+        
+        # Vista oculta: se redibuja al mostrarse (set_view_visible)
+        if getattr(view, '_hidden', False):
+            view._dirty = True
+            return
             
-        current_sales = data_store.get_sales()
+        stats = data_store.get_stats()
         
         # Diferentes tipos de vista requieren diferentes actualizaciones
-        if hasattr(view, 'update_sales'):
-            # Vista normal (SalesView, BalanceView)
-            view.update_sales(current_sales)
+        if hasattr(view, 'update_periods'):
+            # Ingresos por periodo desde el índice temporal (BalanceView)
+            now = time.time()
+            midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+            view.update_periods(
+                data_store.get_period_totals(now - 3600, now + 1),
+                data_store.get_period_totals(midnight, now + 1)
+            )
+        
+        if hasattr(view, 'update_top_products'):
+            view.update_top_products(data_store.get_top_products(5))
+        
+        if hasattr(view, 'update_sales_delta'):
+            # Solo los cambios desde la versión que ya muestra la vista (SalesView)
+            view.update_sales_delta(data_store.get_sales_since(view.version), stats)
+        elif hasattr(view, 'update_sales'):
+            # Vista normal (BalanceView)
+            view.update_sales(data_store.get_sales(), stats)
         elif hasattr(view, 'update_counters'):
             # AppBar
-            total_amount = sum(sale.get('precio', 0) for sale in current_sales)
-            view.update_counters(len(current_sales), total_amount)
+            view.update_counters(stats.count, stats.total)
+    
+    def on_new_sale(sale_data):
+        """Callback que se ejecuta cuando hay una nueva venta o un lote de ventas."""
+        if _frame_scheduler is not None:
+            _frame_scheduler.request(id(view), refresh_view)
+        else:
+            refresh_view()
     
-    # Suscribe el callback al evento
-    dispatcher.subscribe("SALE_ADDED", on_new_sale)
+    # Suscribe el callback a ventas individuales y a lotes (una actualización por lote)
+    for event in ("SALE_ADDED", "SALES_ADDED_BATCH"):
+        if Config.DISPATCH_MODE == "async":
+            # Cola propia por vista: una vista lenta no frena la ingesta
+            dispatcher.subscribe_async(
+                event,
+                on_new_sale,
+                maxsize=Config.DISPATCH_QUEUE_SIZE,
+                policy=Config.DISPATCH_OVERFLOW
+            )
+        else:
+            # Referencia débil: si la vista se descarta, la suscripción desaparece
+            dispatcher.subscribe(event, on_new_sale, weak=True)
     bindings.append(view)  # Opcional para limpieza posterior
     
-    # Store the callback for later initialization
+    # Lista virtual: lee del almacén solo las filas visibles
+    if hasattr(view, 'set_page_loader'):
+        view.set_page_loader(data_store.get_sales_page)
+    # Selector de ventas: busca en el almacén en lugar de listar todo
+    if hasattr(view, 'set_sale_search'):
+        view.set_sale_search(data_store.search_sales)
+    
+    # Store the callbacks for later initialization
     view._on_new_sale = on_new_sale
+    view._refresh_view = refresh_view
+    view._dirty = False
 
 def bind_multiple_views(*views):
     """Vincula múltiples vistas a los eventos de ventas."""
     for view in views:
         bind_sales_to_view(view)
 
+def set_view_visible(view, visible):
+    """
+    Indica si la vista se está mostrando.
+    
+    Mientras está oculta los eventos solo la marcan como pendiente; al
+    mostrarse, si quedó algo pendiente, se redibuja una vez con el estado
+    actual del almacén.
+    """
+    view._hidden = not visible
+    if visible and getattr(view, '_dirty', False) and hasattr(view, '_refresh_view'):
+        view._dirty = False
+        logger.debug(f"👁️ {type(view).__name__} visible de nuevo: render de puesta al día")
+        view._refresh_view()
+
 def initialize_view_data(view):
     """Inicializa la vista con datos actuales después de que esté en la página."""
     # Solo inicializar si la vista ya está en la página
-    if hasattr(view, '_on_new_sale') and hasattr(view, 'page') and view.page is not None:
-        view._on_new_sale(None)
+    if hasattr(view, '_refresh_view') and hasattr(view, 'page') and view.page is not None:
+        view._refresh_view()
 
 def initialize_multiple_views(*views):
     """Inicializa múltiples vistas con datos actuales."""
@@ -55,3 +130,5 @@ def cleanup_bindings():
     """Limpia todas las vinculaciones (útil para cleanup)."""
     global bindings
     bindings = []
+    if _frame_scheduler is not None:
+        _frame_scheduler.cancel()
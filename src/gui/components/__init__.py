@@ -3,5 +3,7 @@ Componentes reutilizables de la interfaz de usuario.
 """
 
 from .app_bar import AppBar
+from .sale_picker import SalePicker
+from .virtual_sales_list import VirtualSalesList
 
-__all__ = ['AppBar']
+__all__ = ['AppBar', 'SalePicker', 'VirtualSalesList']
@@ -0,0 +1,124 @@
+"""
+Selector de ventas con búsqueda.
+
+En lugar de una opción por venta del historial, el dropdown tiene como
+mucho `limit` opciones: las ventas más recientes que coinciden con el
+texto del buscador (un id "#123" o parte del nombre del producto), que
+se piden al almacén (data_store.search_sales) al escribir. Con cada
+cambio del almacén solo se buscan coincidencias entre las ventas nuevas.
+
+Las opciones usan el id estable de la venta como clave, así que la
+selección sigue apuntando a la misma venta aunque lleguen otras; si la
+búsqueda la deja fuera se mantiene al final de la lista, y se descarta
+cuando la venta sale del historial.
+"""
+
+from itertools import islice
+import flet as ft
+from infrastructure.logger import logger
+
+class SalePicker(ft.Column):
+    """Buscador + dropdown de ventas con opciones limitadas y claves estables."""
+    
+    def __init__(self, limit=20, width=400):
+        super().__init__(spacing=5)
+        self.limit = limit
+        self.search_sales = None  # (texto, límite, after) -> ventas; ver data_store.search_sales
+        self.query = ""
+        self.selected_id = None
+        self._selected_option = None
+        self._options = {}        # id de venta -> opción, más reciente primero
+        
+        self.search_field = ft.TextField(
+            label="🔍 Buscar venta",
+            hint_text="#id o nombre de producto",
+            width=width,
+            on_change=self._on_search_change
+        )
+        self.dropdown = ft.Dropdown(
+            label="Seleccionar venta",
+            hint_text=f"Últimas {limit} ventas que coinciden",
+            width=width,
+            options=[],
+            on_change=self._on_select
+        )
+        self.controls = [self.search_field, self.dropdown]
+        self._sync()
+        
+        logger.debug("🏗️ SalePicker inicializado")
+    
+    def apply(self, added, evicted, reset, since):
+        """
+        Actualiza las opciones con un cambio del almacén (ver data_store.SalesDelta).
+        
+        `since` es la versión anterior al cambio. No envía nada al cliente:
+        lo hace el update() de la vista que lo contiene.
+        """
+        if reset:
+            if self.selected_id is not None and not self._retained(self.selected_id, added):
+                self.selected_id = None
+            self._load(self._search(self.query, 0) if self.search_sales else added)
+            return
+        
+        if evicted:
+            # Los desalojados son siempre los más antiguos: un rango de ids
+            oldest_kept = evicted[-1] + 1
+            self._options = {sid: option for sid, option in self._options.items() if sid >= oldest_kept}
+            if self.selected_id is not None and self.selected_id < oldest_kept:
+                self.selected_id = None
+        
+        if added:
+            matches = self._search(self.query, since) if self.search_sales else added
+            if matches:
+                options = {sale.id: self._option(sale) for sale in matches[:self.limit]}
+                options.update(self._options)
+                self._options = dict(islice(options.items(), self.limit))
+        self._sync()
+    
+    def _retained(self, sale_id, added):
+        if self.search_sales is not None:
+            return bool(self.search_sales(f"#{sale_id}", 1, 0))
+        return any(sale.id == sale_id for sale in added)
+    
+    def _search(self, query, after):
+        return self.search_sales(query, self.limit, after)
+    
+    def _load(self, sales):
+        self._options = {sale.id: self._option(sale) for sale in sales[:self.limit]}
+        self._sync()
+    
+    def _option(self, sale):
+        text = f"#{sale.id} - {sale.producto} - ${sale.precio:.2f} ({sale.hora})"
+        return ft.dropdown.Option(key=str(sale.id), text=text)
+    
+    def _sync(self):
+        """Pasa las opciones cargadas (y la selección, si quedó fuera) al dropdown."""
+        options = list(self._options.values())
+        if self.selected_id is not None and self.selected_id not in self._options \
+                and self._selected_option is not None:
+            options.append(self._selected_option)
+        if not options:
+            text = "Sin coincidencias" if self.query else "No hay ventas disponibles"
+            options = [ft.dropdown.Option(key="empty", text=text)]
+        self.dropdown.options = options
+        self.dropdown.value = None if self.selected_id is None else str(self.selected_id)
+    
+    def _on_search_change(self, e):
+        self.query = (e.control.value or "").strip()
+        if self.search_sales is None:
+            return
+        self._load(self._search(self.query, 0))
+        self.dropdown.update()
+    
+    def _on_select(self, e):
+        value = e.control.value
+        if value and value.isdigit():
+            self.selected_id = int(value)
+            self._selected_option = next(
+                (option for option in self.dropdown.options if option.key == value), None
+            )
+        else:
+            self.selected_id = None
+        # Quita la opción fijada de una selección anterior
+        self._sync()
+        self.dropdown.update()
@@ -0,0 +1,99 @@
+"""
+Lista de ventas virtualizada para historiales grandes.
+
+Solo existen como controles las filas visibles más un margen (overscan)
+arriba y abajo; el resto del historial se representa con dos espaciadores
+de la altura equivalente, así que la barra de scroll refleja el historial
+completo. Al hacer scroll se pide al almacén solo la nueva ventana y las
+filas que siguen dentro de ella se reutilizan.
+"""
+
+import math
+import flet as ft
+from infrastructure.logger import logger
+
+class VirtualSalesList(ft.ListView):
+    """ListView con una ventana de filas de altura fija sobre el historial del almacén."""
+    
+    def __init__(self, build_row, height=350, row_height=50, overscan=10):
+        super().__init__(height=height, spacing=0, on_scroll=self._on_scroll, on_scroll_interval=50)
+        self.build_row = build_row
+        self.row_height = row_height
+        self.overscan = overscan
+        self.load_page = None  # (offset, limit) -> (total, ventas); ver data_store.get_sales_page
+        self.total = 0
+        self._first = 0        # Posición de la primera fila materializada
+        self._offset = 0.0     # Scroll actual en píxeles
+        self._rows = {}        # id de venta -> fila materializada
+        self._top = ft.Container(height=0)
+        self._bottom = ft.Container(height=0)
+        self._empty_text = ft.Text(
+            "No hay ventas aún... Esperando nuevas ventas 🔄",
+            size=14,
+            italic=True,
+            color=ft.Colors.GREY_600
+        )
+        self.controls = [self._empty_text]
+        
+        logger.debug(f"🏗️ VirtualSalesList inicializada (ventana de {self.window_size} filas)")
+    
+    @property
+    def window_size(self):
+        """Filas materializadas: las visibles más el overscan de cada lado."""
+        return math.ceil(self.height / self.row_height) + 2 * self.overscan
+    
+    def refresh(self, inserted=0):
+        """
+        Vuelve a leer la ventana actual del almacén.
+        
+        `inserted` son las ventas nuevas arriba desde el último refresco: si
+        el usuario no está al principio de la lista, el scroll se desplaza lo
+        mismo para que las filas que está mirando no se muevan.
+        """
+        if self.load_page is None:
+            return
+        if inserted and self._offset > 0:
+            self._offset += inserted * self.row_height
+            self.scroll_to(offset=self._offset, duration=0)
+        self._render(self._first_for(self._offset))
+    
+    def _first_for(self, offset):
+        return max(0, int(offset // self.row_height) - self.overscan)
+    
+    def _render(self, first):
+        total, sales = self.load_page(first, self.window_size)
+        if first and not sales and total:
+            # El historial se encogió (reset): ventana al final de lo que queda
+            first = max(0, total - self.window_size)
+            total, sales = self.load_page(first, self.window_size)
+        self.total = total
+        self._first = first
+        
+        if not total:
+            self._rows = {}
+            self.controls = [self._empty_text]
+            return
+        
+        rows = {}
+        for sale in sales:
+            row = self._rows.get(sale.id)
+            if row is None:
+                row = ft.Container(
+                    content=self.build_row(sale),
+                    height=self.row_height,
+                    padding=ft.padding.only(bottom=5)
+                )
+            rows[sale.id] = row
+        self._rows = rows
+        self._top.height = first * self.row_height
+        self._bottom.height = (total - first - len(sales)) * self.row_height
+        self.controls = [self._top, *rows.values(), self._bottom]
+    
+    def _on_scroll(self, e):
+        """Materializa otra ventana solo cuando el scroll cruza una fila."""
+        self._offset = e.pixels
+        first = self._first_for(e.pixels)
+        if first == self._first or self.load_page is None:
+            return
+        self._render(first)
+        self.update()
@@ -0,0 +1,59 @@
+"""
+Agrupa las notificaciones de cambio de la UI por frame.
+
+Durante una ráfaga de eventos cada vista se redibuja como mucho una vez
+por ventana de frame, sin importar cuántas ventas lleguen; la primera
+notificación tras un periodo tranquilo se entrega en la siguiente vuelta
+del loop, sin esperar.
+"""
+
+import asyncio
+from infrastructure.logger import logger
+
+
+class FrameScheduler:
+    """Entrega como máximo una notificación por vista y por frame."""
+
+    def __init__(self, fps):
+        self.frame_interval = 1.0 / fps
+        self._dirty = {}  # clave de vista -> callback de render
+        self._handle = None
+        self._last_flush = float("-inf")
+        self.requested = 0
+        self.rendered = 0
+
+    def request(self, key, callback):
+        """Marca la vista `key` como pendiente de render con `callback`."""
+        self.requested += 1
+        self._dirty[key] = callback
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin loop (p. ej. inicialización síncrona): render inmediato
+            self._flush()
+            return
+        delay = max(0.0, self._last_flush + self.frame_interval - loop.time())
+        self._handle = loop.call_later(delay, self._flush)
+
+    def _flush(self):
+        self._handle = None
+        try:
+            self._last_flush = asyncio.get_running_loop().time()
+        except RuntimeError:
+            pass
+        dirty, self._dirty = self._dirty, {}
+        for callback in dirty.values():
+            self.rendered += 1
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"💥 Error al renderizar frame: {e}")
+
+    def cancel(self):
+        """Descarta lo pendiente."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._dirty.clear()
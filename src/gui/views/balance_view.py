@@ -15,6 +15,9 @@ class BalanceView(ft.Column):
         self.balance_text = None
         self.sales_count_text = None
         self.average_text = None
+        self.last_hour_text = None
+        self.today_text = None
+        self.top_products_column = None
         self.spacing = 20
         self._build_components()
         
@@ -52,12 +55,27 @@ class BalanceView(ft.Column):
             color=ft.Colors.GREY_700
         )
         
+        # Ingresos por periodo
+        self.last_hour_text = ft.Text(
+            "Última hora: $0.00 (0 ventas)",
+            size=14,
+            color=ft.Colors.GREY_700
+        )
+        self.today_text = ft.Text(
+            "Hoy: $0.00 (0 ventas)",
+            size=14,
+            color=ft.Colors.GREY_700
+        )
+        
         # Contenedor principal con estilo
         balance_container = ft.Container(
             content=ft.Column([
                 self.balance_text,
                 self.sales_count_text,
-                self.average_text
+                self.average_text,
+                ft.Divider(height=10),
+                self.last_hour_text,
+                self.today_text
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
             padding=40,
             border_radius=15,
@@ -67,6 +85,22 @@ class BalanceView(ft.Column):
             alignment=ft.alignment.center
         )
         
+        # Productos más vendidos
+        self.top_products_column = ft.Column(
+            [ft.Text("Sin ventas todavía", size=14, italic=True, color=ft.Colors.GREY_600)],
+            spacing=4
+        )
+        top_products_container = ft.Container(
+            content=ft.Column([
+                ft.Text("🏆 Más vendidos", size=16, weight=ft.FontWeight.BOLD),
+                self.top_products_column
+            ], spacing=8),
+            padding=20,
+            border_radius=15,
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            width=400
+        )
+        
         # Icono decorativo
         icon = ft.Icon(
             ft.Icons.ACCOUNT_BALANCE_WALLET,
@@ -81,6 +115,7 @@ class BalanceView(ft.Column):
             icon,
             ft.Divider(height=20),
             balance_container,
+            top_products_container,
             ft.Divider(height=20),
             ft.Text(
                 "💡 Este balance se actualiza automáticamente con cada nueva venta",
@@ -93,16 +128,45 @@ class BalanceView(ft.Column):
         # Centrar todo
         self.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     
-    def update_sales(self, sales):
+    def update_periods(self, last_hour, today):
+        """
+        Actualiza los ingresos por periodo.
+        
+        Solo modifica los textos; se envían al cliente con el siguiente update_sales.
+        """
+        self.last_hour_text.value = f"Última hora: ${last_hour.total:.2f} ({last_hour.count} ventas)"
+        self.today_text.value = f"Hoy: ${today.total:.2f} ({today.count} ventas)"
+    
+    def update_top_products(self, top_products):
+        """
+        Actualiza el panel de productos más vendidos.
+        
+        Solo modifica los controles; se envían al cliente con el siguiente update_sales.
+        """
+        if not top_products:
+            self.top_products_column.controls = [
+                ft.Text("Sin ventas todavía", size=14, italic=True, color=ft.Colors.GREY_600)
+            ]
+            return
+        self.top_products_column.controls = [
+            ft.Row([
+                ft.Text(f"{position}. {product.producto}", size=14, expand=True),
+                ft.Text(f"{product.count} ventas", size=12, color=ft.Colors.GREY_600),
+                ft.Text(f"${product.total:.2f}", size=14, weight=ft.FontWeight.BOLD)
+            ])
+            for position, product in enumerate(top_products, start=1)
+        ]
+    
+    def update_sales(self, sales, stats):
         """Actualiza el balance basado en las ventas."""
         # Verificar que el control esté en la página antes de actualizar
         if not self.balance_text or not hasattr(self, 'page') or self.page is None:
             return
             
-        # Calcula totales
-        self.total_sales = len(sales)
-        self.total_amount = sum(sale.get('precio', 0) for sale in sales)
-        average = self.total_amount / self.total_sales if self.total_sales > 0 else 0
+        # Totales precalculados por el data_store
+        self.total_sales = stats.count
+        self.total_amount = stats.total
+        average = stats.mean
         
         # Actualiza textos
         self.balance_text.value = f"${self.total_amount:.2f}"
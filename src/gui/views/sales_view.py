@@ -1,20 +1,46 @@
 """
 Vista de monitor de ventas en tiempo real.
+
+La lista se actualiza de forma incremental con los cambios del almacén
+(data_store.get_sales_since): cada venta nueva inserta una tarjeta arriba,
+cada venta desalojada quita la suya de abajo y las demás se reutilizan,
+así que el coste por venta no depende del tamaño del historial. Las
+tarjetas se identifican por el id estable de la venta.
+
+El selector de ventas es un SalePicker: busca en el almacén y carga
+como mucho PICKER_LIMIT opciones, con el id de la venta como clave.
+
+Con EXPENDIO_SALES_LIST=virtual la lista es un VirtualSalesList: solo
+existen las filas visibles (más un margen), leídas del almacén por
+posición, así que la memoria y el payload no crecen con el historial.
 """
 
 import flet as ft
+from gui.components.sale_picker import SalePicker
+from gui.components.virtual_sales_list import VirtualSalesList
+from infrastructure.config import Config
 from infrastructure.logger import logger
 
+LIST_HEIGHT = 350
+ROW_HEIGHT = 50  # Alto fijo de cada fila en el modo virtual (tarjeta + separación)
+PICKER_LIMIT = 20  # Opciones cargadas a la vez en el selector de ventas
+
 class SalesView(ft.Column):
     """Vista principal que muestra las ventas."""
     
-    def __init__(self):
+    def __init__(self, list_mode=None):
         super().__init__()
+        self.list_mode = (list_mode or Config.SALES_LIST).lower()
         self.sales_column = None
+        self.sales_list = None  # VirtualSalesList en el modo virtual
+        self.sale_picker = None
         self.sales_dropdown = None
         self.total_sales = 0
         self.total_amount = 0.0
         self.stats_text = None
+        self.version = 0      # Versión del almacén ya reflejada en la vista
+        self._cards = {}      # id de venta -> tarjeta en sales_column
+        self._empty_text = None
         self.spacing = 10
         self._build_components()
         
@@ -37,24 +63,28 @@ class SalesView(ft.Column):
             color=ft.Colors.GREEN_700
         )
         
-        # Dropdown para seleccionar ventas
-        self.sales_dropdown = ft.Dropdown(
-            label="🔍 Seleccionar venta",
-            hint_text="Selecciona una venta de la lista",
-            width=400,
-            options=[]
-        )
+        # Selector de ventas con búsqueda (opciones limitadas)
+        self.sale_picker = SalePicker(limit=PICKER_LIMIT, width=400)
+        self.sales_dropdown = self.sale_picker.dropdown
         
-        # Columna de ventas
-        self.sales_column = ft.Column(
-            scroll=ft.ScrollMode.ALWAYS,
-            height=350,
-            spacing=5
-        )
+        # Lista de ventas: todas las tarjetas o solo la ventana visible
+        if self.list_mode == "virtual":
+            self.sales_list = VirtualSalesList(
+                self._sale_card,
+                height=LIST_HEIGHT,
+                row_height=ROW_HEIGHT,
+                overscan=Config.SALES_LIST_OVERSCAN
+            )
+        else:
+            self.sales_column = ft.Column(
+                scroll=ft.ScrollMode.ALWAYS,
+                height=LIST_HEIGHT,
+                spacing=5
+            )
         
         # Contenedor de ventas
         sales_container = ft.Container(
-            content=self.sales_column,
+            content=self.sales_list or self.sales_column,
             border=ft.border.all(1, ft.Colors.GREY_400),
             border_radius=10,
             padding=10,
@@ -66,66 +96,122 @@ class SalesView(ft.Column):
             title,
             self.stats_text,
             ft.Divider(height=20),
-            self.sales_dropdown,
+            self.sale_picker,
             ft.Divider(height=10),
             ft.Text("📋 Últimas ventas:", size=18, weight=ft.FontWeight.BOLD),
             sales_container
         ]
+        self._show_empty()
     
-    def update_sales(self, sales):
-        """Actualiza la lista de ventas en la UI."""
-        # Verificar que el control esté en la página antes de actualizar
-        if not self.sales_column or not hasattr(self, 'page') or self.page is None:
+    def update_sales(self, sales, stats):
+        """Redibuja la lista completa a partir del historial (más reciente primero)."""
+        if not self.stats_text or not hasattr(self, 'page') or self.page is None:
             return
-            
-        # Calcula estadísticas
-        self.total_sales = len(sales)
-        self.total_amount = sum(sale.get('precio', 0) for sale in sales)
         
-        # Actualiza estadísticas
-        self.stats_text.value = f"📊 Ventas: {self.total_sales} | 💰 Total: ${self.total_amount:.2f}"
+        self._update_stats(stats)
+        self.sale_picker.apply(sales, [], True, self.version)
+        if self.sales_list is not None:
+            self.sales_list.refresh()
+        else:
+            self._replace_all(sales)
+        self.version = sales[0].id if sales else 0
         
-        # Actualiza dropdown options
-        self.sales_dropdown.options = []
-        for i, sale in enumerate(sales):
-            option_text = f"#{i+1} - {sale['producto']} - ${sale['precio']:.2f} ({sale['hora']})"
-            self.sales_dropdown.options.append(
-                ft.dropdown.Option(key=str(i), text=option_text)
-            )
+        logger.log_ui_update("SalesView", len(sales))
+        self.update()
+    
+    def update_sales_delta(self, delta, stats):
+        """Aplica los cambios del almacén (data_store.SalesDelta) desde la última versión mostrada."""
+        # Verificar que el control esté en la página antes de actualizar
+        if not self.stats_text or not hasattr(self, 'page') or self.page is None:
+            return
         
-        # Si no hay ventas, añadir opción vacía
-        if not sales:
-            self.sales_dropdown.options = [
-                ft.dropdown.Option(key="empty", text="No hay ventas disponibles")
-            ]
+        self._update_stats(stats)
+        self.sale_picker.apply(delta.added, delta.evicted, delta.reset, self.version)
+        if self.sales_list is not None:
+            self.sales_list.refresh(0 if delta.reset else len(delta.added))
+        elif delta.reset:
+            self._replace_all(delta.added)
+        else:
+            self._remove_evicted(delta.evicted)
+            self._insert_newest(delta.added)
+        self.version = delta.version
         
-        # Actualiza lista de ventas
-        self.sales_column.controls = []
-        for i, sale in enumerate(sales):
-            sale_card = ft.Container(
-                content=ft.Row([
-                    ft.Text(f"#{i+1}", size=12, color=ft.Colors.GREY_600),
-                    ft.Text(sale['producto'], size=14, expand=True),
-                    ft.Text(f"${sale['precio']:.2f}", size=14, weight=ft.FontWeight.BOLD),
-                    ft.Text(sale['hora'], size=12, color=ft.Colors.GREY_600)
-                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                padding=8,
-                border_radius=5,
-                bgcolor=ft.Colors.WHITE,
-                border=ft.border.all(1, ft.Colors.GREY_300)
+        logger.log_ui_update("SalesView", len(delta.added))
+        self.update()
+    
+    def set_page_loader(self, load_page):
+        """Fuente de filas del modo virtual: (offset, limit) -> (total, ventas)."""
+        if self.sales_list is not None:
+            self.sales_list.load_page = load_page
+    
+    def set_sale_search(self, search_sales):
+        """Búsqueda del selector: (texto, límite, after) -> ventas."""
+        self.sale_picker.search_sales = search_sales
+    
+    def _update_stats(self, stats):
+        # Estadísticas precalculadas por el data_store
+        self.total_sales = stats.count
+        self.total_amount = stats.total
+        self.stats_text.value = f"📊 Ventas: {self.total_sales} | 💰 Total: ${self.total_amount:.2f}"
+    
+    def _sale_card(self, sale):
+        """Tarjeta de una venta; no cambia una vez creada."""
+        return ft.Container(
+            content=ft.Row([
+                ft.Text(f"#{sale.id}", size=12, color=ft.Colors.GREY_600),
+                ft.Text(sale.producto, size=14, expand=True),
+                ft.Text(f"${sale.precio:.2f}", size=14, weight=ft.FontWeight.BOLD),
+                ft.Text(sale.hora, size=12, color=ft.Colors.GREY_600)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            padding=8,
+            border_radius=5,
+            bgcolor=ft.Colors.WHITE,
+            border=ft.border.all(1, ft.Colors.GREY_300)
+        )
+    
+    def _show_empty(self):
+        """Muestra el estado vacío en la lista de tarjetas."""
+        self._cards.clear()
+        if self.sales_column is None:
+            return
+        if self._empty_text is None:
+            self._empty_text = ft.Text(
+                "No hay ventas aún... Esperando nuevas ventas 🔄",
+                size=14,
+                italic=True,
+                color=ft.Colors.GREY_600
             )
-            self.sales_column.controls.append(sale_card)
-        
-        # Si no hay ventas
+        self.sales_column.controls = [self._empty_text]
+    
+    def _replace_all(self, sales):
+        """Descarta las tarjetas y las crea de nuevo (arranque o reset del almacén)."""
         if not sales:
-            self.sales_column.controls.append(
-                ft.Text(
-                    "No hay ventas aún... Esperando nuevas ventas 🔄",
-                    size=14,
-                    italic=True,
-                    color=ft.Colors.GREY_600
-                )
-            )
-        
-        logger.log_ui_update("SalesView", len(sales))
-        self.update()
+            self._show_empty()
+            return
+        self._cards = {sale.id: self._sale_card(sale) for sale in sales}
+        self.sales_column.controls = list(self._cards.values())
+    
+    def _insert_newest(self, sales):
+        """Inserta arriba las tarjetas de las ventas nuevas (más reciente primero)."""
+        if not sales:
+            return
+        if not self._cards:
+            # Quita el estado vacío
+            self.sales_column.controls = []
+        cards = [self._sale_card(sale) for sale in sales]
+        self.sales_column.controls[0:0] = cards
+        self._cards.update(zip((sale.id for sale in sales), cards))
+    
+    def _remove_evicted(self, sale_ids):
+        """Quita de abajo las tarjetas de las ventas desalojadas (las más antiguas)."""
+        removed = 0
+        for sale_id in sale_ids:
+            # Las ventas añadidas y desalojadas entre dos refrescos nunca se mostraron
+            if self._cards.pop(sale_id, None) is not None:
+                removed += 1
+        if not removed:
+            return
+        if not self._cards:
+            self._show_empty()
+            return
+        del self.sales_column.controls[-removed:]
@@ -27,7 +27,51 @@ class Config:
     
     # Configuración de la aplicación
     MAX_SALES_HISTORY = int(os.getenv("EXPENDIO_MAX_HISTORY", "10"))
-    SIMULATION_INTERVAL = int(os.getenv("EXPENDIO_SIM_INTERVAL", "5"))
+    SIMULATION_INTERVAL = float(os.getenv("EXPENDIO_SIM_INTERVAL", "5"))
+    
+    # Simulación: "interval" (una venta cada SIM_INTERVAL) o "load" (generador de carga)
+    SIMULATION_MODE = os.getenv("EXPENDIO_SIM_MODE", "interval").lower()
+    LOAD_SCHEDULE = os.getenv("EXPENDIO_LOAD_SCHEDULE", "100")
+    LOAD_PROFILE = os.getenv("EXPENDIO_LOAD_PROFILE", "poisson").lower()
+    LOAD_SEED = int(os.getenv("EXPENDIO_LOAD_SEED")) if os.getenv("EXPENDIO_LOAD_SEED") else None
+    LOAD_BURST_SIZE = float(os.getenv("EXPENDIO_LOAD_BURST_SIZE", "20"))
+    LOAD_REPORT_INTERVAL = float(os.getenv("EXPENDIO_LOAD_REPORT_INTERVAL", "5"))
+    
+    # Origen de las ventas: "simulator", "file", "tcp", "unix" o "stdin"
+    SOURCE = os.getenv("EXPENDIO_SOURCE", "simulator").lower()
+    SOURCE_PATH = os.getenv("EXPENDIO_SOURCE_PATH", "")
+    SOURCE_HOST = os.getenv("EXPENDIO_SOURCE_HOST", "127.0.0.1")
+    SOURCE_PORT = int(os.getenv("EXPENDIO_SOURCE_PORT", "9100"))
+    SOURCE_FROM_START = os.getenv("EXPENDIO_SOURCE_FROM_START", "false").lower() == "true"
+    SOURCE_BATCH_SIZE = int(os.getenv("EXPENDIO_SOURCE_BATCH_SIZE", "1000"))
+    # Procesos que parsean el origen tcp y entregan por memoria compartida (0 = en este proceso)
+    INGEST_WORKERS = int(os.getenv("EXPENDIO_INGEST_WORKERS", "0"))
+    INGEST_RING_SIZE = int(os.getenv("EXPENDIO_INGEST_RING_SIZE", "65536"))
+    REPLAY_SPEED = os.getenv("EXPENDIO_REPLAY_SPEED", "1").lower()  # Factor o "max"
+    
+    # Grabación de la sesión de ventas (vacío = desactivada)
+    RECORD_PATH = os.getenv("EXPENDIO_RECORD_PATH", "")
+    
+    # Persistencia del historial (journal vacío = desactivado)
+    JOURNAL_PATH = os.getenv("EXPENDIO_JOURNAL_PATH", "")
+    JOURNAL_BATCH_SIZE = int(os.getenv("EXPENDIO_JOURNAL_BATCH_SIZE", "512"))
+    JOURNAL_FLUSH_INTERVAL = float(os.getenv("EXPENDIO_JOURNAL_FLUSH_INTERVAL", "1.0"))
+    
+    # Despacho de eventos a la UI: "sync" (en línea) o "async" (cola por suscriptor)
+    DISPATCH_MODE = os.getenv("EXPENDIO_DISPATCH_MODE", "sync").lower()
+    DISPATCH_QUEUE_SIZE = int(os.getenv("EXPENDIO_DISPATCH_QUEUE_SIZE", "100"))
+    DISPATCH_OVERFLOW = os.getenv("EXPENDIO_DISPATCH_OVERFLOW", "coalesce").lower()
+    DISPATCH_METRICS = os.getenv("EXPENDIO_DISPATCH_METRICS", "false").lower() == "true"
+    DISPATCH_METRICS_INTERVAL = float(os.getenv("EXPENDIO_DISPATCH_METRICS_INTERVAL", "60"))
+    DISPATCH_THREAD_WORKERS = int(os.getenv("EXPENDIO_DISPATCH_THREAD_WORKERS", "4"))
+    DISPATCH_PROCESS_WORKERS = int(os.getenv("EXPENDIO_DISPATCH_PROCESS_WORKERS", "2"))
+    
+    # Máximo de redibujados por vista y segundo (0 = redibujar en cada evento)
+    UI_FPS = float(os.getenv("EXPENDIO_UI_FPS", "30"))
+    
+    # Lista de ventas: "full" (una tarjeta por venta) o "virtual" (solo las filas visibles)
+    SALES_LIST = os.getenv("EXPENDIO_SALES_LIST", "full").lower()
+    SALES_LIST_OVERSCAN = int(os.getenv("EXPENDIO_SALES_LIST_OVERSCAN", "10"))
     
     # Configuración de la ventana
     WINDOW_WIDTH = int(os.getenv("EXPENDIO_WINDOW_WIDTH", "1000"))
@@ -50,3 +94,15 @@ class Config:
         print(f"  Log to Console: {cls.LOG_TO_CONSOLE}")
         print(f"  Max History: {cls.MAX_SALES_HISTORY}")
         print(f"  Simulation Interval: {cls.SIMULATION_INTERVAL}s")
+        print(f"  Simulation Mode: {cls.SIMULATION_MODE}")
+        if cls.SIMULATION_MODE == "load":
+            print(f"  Load: {cls.LOAD_SCHEDULE} ({cls.LOAD_PROFILE}, semilla {cls.LOAD_SEED})")
+        print(f"  Source: {cls.SOURCE} {cls.SOURCE_PATH or (f'{cls.SOURCE_HOST}:{cls.SOURCE_PORT}' if cls.SOURCE == 'tcp' else '')}")
+        print(f"  Ingest Workers: {cls.INGEST_WORKERS or 'desactivados'} (anillo {cls.INGEST_RING_SIZE})")
+        print(f"  Record: {cls.RECORD_PATH or 'desactivado'}")
+        print(f"  Journal: {cls.JOURNAL_PATH or 'desactivado'}")
+        print(f"  Dispatch Mode: {cls.DISPATCH_MODE} (cola {cls.DISPATCH_QUEUE_SIZE}, {cls.DISPATCH_OVERFLOW})")
+        print(f"  UI FPS: {cls.UI_FPS or 'sin límite'}")
+        print(f"  Sales List: {cls.SALES_LIST} (overscan {cls.SALES_LIST_OVERSCAN})")
+        print(f"  Dispatch Metrics: {cls.DISPATCH_METRICS} (cada {cls.DISPATCH_METRICS_INTERVAL}s)")
+        print(f"  Dispatch Workers: {cls.DISPATCH_THREAD_WORKERS} hilos / {cls.DISPATCH_PROCESS_WORKERS} procesos")
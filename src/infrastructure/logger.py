@@ -58,6 +58,10 @@ class AppLogger:
         self._logger.info("🚀 Sistema de logging iniciado")
         self._logger.debug(f"Configuración: Level={Config.LOG_LEVEL}, File={Config.LOG_TO_FILE}, Console={Config.LOG_TO_CONSOLE}")
     
+    def is_debug_enabled(self):
+        """Indica si los mensajes DEBUG se emiten (para evitar formatearlos en vano)."""
+        return self._logger.isEnabledFor(logging.DEBUG)
+    
     def debug(self, message):
         """Log nivel DEBUG."""
         self._logger.debug(message)
@@ -80,7 +84,12 @@ class AppLogger:
     
     def log_sale(self, sale):
         """Log específico para ventas."""
-        self._logger.info(f"💰 Nueva venta: {sale['producto']} - ${sale['precio']:.2f} @ {sale['hora']}")
+        self._logger.info(f"💰 Nueva venta: {sale.producto} - ${sale.precio:.2f} @ {sale.hora}")
+    
+    def log_sale_batch(self, sales):
+        """Log resumido para un lote de ventas."""
+        total = sum(sale.price_cents for sale in sales) / 100
+        self._logger.info(f"💰 Lote de {len(sales)} ventas - ${total:.2f}")
     
     def log_ui_update(self, view_name, data_count):
         """Log específico para actualizaciones de UI."""
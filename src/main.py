@@ -4,12 +4,13 @@ Punto de entrada principal de la aplicación Flet.
 
 import flet as ft
 import asyncio
-from core import updater
+from core import data_store, ingest, session, shm_ingest, sources, updater
 from infrastructure.config import Config
 from infrastructure.logger import logger
+from events import metrics
 from gui.views import SalesView, BalanceView
 from gui.components import AppBar
-from gui.bindings import bind_multiple_views, initialize_multiple_views
+from gui.bindings import bind_multiple_views, initialize_multiple_views, set_view_visible
 
 class MainApp(ft.Column):
     """Aplicación principal con AppBar y navegación lateral usando View State Preservation Pattern."""
@@ -107,6 +108,10 @@ class MainApp(ft.Column):
             # Mostrar balance, ocultar ventas
             self.sales_container.visible = False
             self.balance_container.visible = True
+        
+        # La vista oculta deja de redibujarse; la visible se pone al día si quedó pendiente
+        set_view_visible(self.sales_view, self.sales_container.visible)
+        set_view_visible(self.balance_view, self.balance_container.visible)
     
     def setup_bindings_and_initialize(self):
         """Configura eventos e inicializa datos DESPUÉS de estar en la página."""
@@ -115,6 +120,9 @@ class MainApp(ft.Column):
         # Vincular todas las vistas (incluyendo AppBar) a los eventos
         bind_multiple_views(self.sales_view, self.balance_view, self.app_bar)
         
+        # Las vistas ocultas no se redibujan hasta que se muestran
+        self._update_visibility()
+        
         # Inicializar con datos actuales
         initialize_multiple_views(self.sales_view, self.balance_view, self.app_bar)
         
@@ -140,6 +148,15 @@ async def main(page: ft.Page):
     
     logger.debug(f"Ventana configurada: {Config.WINDOW_WIDTH}x{Config.WINDOW_HEIGHT}")
     
+    # Restaurar el historial persistido antes de construir las vistas
+    if Config.JOURNAL_PATH:
+        await data_store.open_journal(Config.JOURNAL_PATH)
+    
+    # Medición de latencias del dispatcher con resumen periódico en el log
+    if Config.DISPATCH_METRICS:
+        metrics.enable()
+        asyncio.create_task(metrics.log_summary_periodically(Config.DISPATCH_METRICS_INTERVAL))
+    
     # Crear la aplicación principal
     main_app = MainApp()
     
@@ -150,11 +167,28 @@ async def main(page: ft.Page):
     # AHORA configurar eventos e inicializar (después de estar en la página)
     main_app.setup_bindings_and_initialize()
     
+    # Los productores en otros hilos entregan sus ventas a este loop
+    ingest.start()
+    
     logger.info("✅ Aplicación completamente inicializada")
     
-    # Lanzar el simulador de ventas en paralelo
+    # Grabar la sesión para poder reproducirla (EXPENDIO_SOURCE=replay)
+    if Config.RECORD_PATH:
+        session.SessionRecorder(Config.RECORD_PATH).start()
+    
+    # Lanzar el origen de ventas (simulador o feed real) en paralelo
     # Esto no bloquea la interfaz de usuario
-    asyncio.create_task(updater.start_simulation())
+    if Config.SOURCE == "tcp" and Config.INGEST_WORKERS > 0:
+        # El parseo ocurre en procesos aparte; aquí solo se drenan sus anillos
+        workers = shm_ingest.ShmIngest(Config.INGEST_WORKERS, Config.INGEST_RING_SIZE)
+        workers.start(Config.SOURCE_HOST, Config.SOURCE_PORT, Config.SOURCE_BATCH_SIZE)
+        asyncio.create_task(workers.run())
+    else:
+        source = sources.create_source()
+        if source is None:
+            asyncio.create_task(updater.start_simulation())
+        else:
+            asyncio.create_task(source.run())
 
 if __name__ == "__main__":
     # Ejecutar la aplicación